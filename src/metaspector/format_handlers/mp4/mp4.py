@@ -2,12 +2,17 @@
 
 import struct
 
-from typing import BinaryIO, Dict, Any, Optional, List
+from typing import BinaryIO, Dict, Any, Optional, List, Set
 from ...format_handlers.base import BaseMediaParser
-from .mp4_utils import _read_box_header, _read_uint32, _read_uint64
+from .mp4_utils import _read_box_header
 from .mp4_boxes import MP4BoxParser
 from ...matrices.language_matrix import get_long_language_name
 
+# Two 32-bit header fields: stsz (sample_size, sample_count) and stco
+# (entry_count, first offset). co64 widens the offset to 64 bits.
+_U32_PAIR = struct.Struct(">II")
+_CO64_HEADER = struct.Struct(">IQ")
+
 
 class Mp4Parser(BaseMediaParser):
     """
@@ -20,9 +25,17 @@ class Mp4Parser(BaseMediaParser):
         This local class is kept for type hinting convenience within Mp4Parser.
         """
 
-        pass
-
-    def __init__(self):
+        __slots__ = ()
+
+    def __init__(
+        self,
+        include_cover_dimensions: bool = True,
+        wanted_keys: Optional[Set[str]] = None,
+        use_cache: bool = True,
+    ):
+        self.include_cover_dimensions = include_cover_dimensions
+        self.wanted_keys = wanted_keys
+        self.use_cache = use_cache
         self.audio_tracks: List[Dict[str, Any]] = []
         self.subtitle_tracks: List[Dict[str, Any]] = []
         self.video_tracks: List[Dict[str, Any]] = []
@@ -64,7 +77,15 @@ class Mp4Parser(BaseMediaParser):
                         track["duration_seconds"] = duration_in_seconds
                 break
             elif box_type == b"meta":
-                self.metadata.update(MP4BoxParser.parse_meta(f, box_end))
+                self.metadata.update(
+                    MP4BoxParser.parse_meta(
+                        f,
+                        box_end,
+                        self.include_cover_dimensions,
+                        self.wanted_keys,
+                        self.use_cache,
+                    )
+                )
 
             current_pos = box_end
 
@@ -372,11 +393,27 @@ class Mp4Parser(BaseMediaParser):
                     if not udta_child_type or udta_child_end > box_end:
                         break
                     if udta_child_type == b"meta":
-                        self.metadata.update(MP4BoxParser.parse_meta(f, udta_child_end))
+                        self.metadata.update(
+                            MP4BoxParser.parse_meta(
+                                f,
+                                udta_child_end,
+                                self.include_cover_dimensions,
+                                self.wanted_keys,
+                                self.use_cache,
+                            )
+                        )
                         break
                     udta_current_pos = udta_child_end
             elif box_type == b"meta":
-                self.metadata.update(MP4BoxParser.parse_meta(f, box_end))
+                self.metadata.update(
+                    MP4BoxParser.parse_meta(
+                        f,
+                        box_end,
+                        self.include_cover_dimensions,
+                        self.wanted_keys,
+                        self.use_cache,
+                    )
+                )
             current_pos = box_end
         f.seek(moov_end)
 
@@ -481,9 +518,11 @@ class Mp4Parser(BaseMediaParser):
                                                 )
                                     elif stbl_type == b"stsz":
                                         f.seek(stbl_box_start + 8 + 4)
-                                        uniform_size = _read_uint32(f)
-                                        sample_count = _read_uint32(f)
-                                        if sample_count is not None:
+                                        stsz_header = f.read(8)
+                                        if len(stsz_header) == 8:
+                                            uniform_size, sample_count = (
+                                                _U32_PAIR.unpack(stsz_header)
+                                            )
                                             total_samples = sample_count
                                             if uniform_size != 0:
                                                 if first_sample_size is None:
@@ -508,17 +547,25 @@ class Mp4Parser(BaseMediaParser):
                                             and first_chunk_offset is None
                                     ):
                                         f.seek(stbl_box_start + 8 + 4)
-                                        entry_count = _read_uint32(f)
-                                        if entry_count is not None and entry_count > 0:
-                                            first_chunk_offset = _read_uint32(f)
+                                        stco_header = f.read(8)
+                                        if len(stco_header) == 8:
+                                            entry_count, offset = _U32_PAIR.unpack(
+                                                stco_header
+                                            )
+                                            if entry_count > 0:
+                                                first_chunk_offset = offset
                                     elif (
                                             stbl_type == b"co64"
                                             and first_chunk_offset is None
                                     ):
                                         f.seek(stbl_box_start + 8 + 4)
-                                        entry_count = _read_uint32(f)
-                                        if entry_count is not None and entry_count > 0:
-                                            first_chunk_offset = _read_uint64(f)
+                                        co64_header = f.read(12)
+                                        if len(co64_header) == 12:
+                                            entry_count, offset = _CO64_HEADER.unpack(
+                                                co64_header
+                                            )
+                                            if entry_count > 0:
+                                                first_chunk_offset = offset
                                     f.seek(stbl_end)
                                     stbl_pos = stbl_end
                             f.seek(minf_end)
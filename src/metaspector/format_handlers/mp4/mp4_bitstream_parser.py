@@ -6,10 +6,9 @@ import struct
 
 from typing import BinaryIO, Dict, Any, Optional
 from .mp4_utils import (
-    _read_box_header,
-    _read_uint8,
-    _read_uint32,
-    _read_uint64,
+    _read_box_header_from_buffer,
+    _U32,
+    _U64,
     COLOR_PRIMARIES_MAP,
     TRANSFER_CHARACTERISTICS_MAP,
     MATRIX_COEFFICIENTS_MAP,
@@ -17,40 +16,113 @@ from .mp4_utils import (
 
 logger = logging.getLogger(__name__)
 
+_U32_PAIR = struct.Struct(">II")
+_U16_PAIR = struct.Struct(">HH")
+
 
 class BitReader:
-    """A helper class for reading bits from a byte stream."""
+    """
+    A helper class for reading bits from a byte stream.
+    Bits are served from an integer window that is refilled roughly eight
+    bytes at a time, so most reads are a single shift and mask.
+    """
+
+    __slots__ = ("data", "_pos", "_window", "_window_bits")
 
     def __init__(self, data: bytes):
         self.data = data
-        self.byte_pos = 0
-        self.bit_pos = 0
+        self._pos = 0  # Next byte to load into the window.
+        self._window = 0
+        self._window_bits = 0  # Unread bits at the bottom of the window.
+
+    @property
+    def byte_pos(self) -> int:
+        return (self._pos * 8 - self._window_bits) >> 3
+
+    @property
+    def bit_pos(self) -> int:
+        return -self._window_bits & 7
+
+    def _refill(self, num_bits: int) -> None:
+        pos = self._pos
+        take = min(
+            (max(num_bits, 64) - self._window_bits + 7) >> 3, len(self.data) - pos
+        )
+        if take <= 0:
+            return
+        self._window = (
+            (self._window & ((1 << self._window_bits) - 1)) << (take * 8)
+        ) | int.from_bytes(self.data[pos : pos + take], "big")
+        self._window_bits += take * 8
+        self._pos = pos + take
+
+    def _exhaust(self) -> None:
+        self._pos = len(self.data)
+        self._window = 0
+        self._window_bits = 0
 
     def read_bit(self) -> int:
-        if self.byte_pos >= len(self.data):
-            raise IndexError("Reading past end of data")
-        byte = self.data[self.byte_pos]
-        bit = (byte >> (7 - self.bit_pos)) & 1
-        self.bit_pos += 1
-        if self.bit_pos == 8:
-            self.bit_pos = 0
-            self.byte_pos += 1
-        return bit
+        if not self._window_bits:
+            self._refill(1)
+            if not self._window_bits:
+                raise IndexError("Reading past end of data")
+        self._window_bits -= 1
+        return (self._window >> self._window_bits) & 1
 
     def read_bits(self, num_bits: int) -> int:
-        value = 0
-        for _ in range(num_bits):
-            value = (value << 1) | self.read_bit()
-        return value
+        if num_bits <= 0:
+            return 0
+        if self._window_bits < num_bits:
+            self._refill(num_bits)
+            if self._window_bits < num_bits:
+                self._exhaust()
+                raise IndexError("Reading past end of data")
+        self._window_bits -= num_bits
+        return (self._window >> self._window_bits) & ((1 << num_bits) - 1)
+
+    def skip_bits(self, num_bits: int) -> None:
+        """Advances past num_bits without extracting them; fails like read_bits."""
+        if num_bits <= 0:
+            return
+        if num_bits <= self._window_bits:
+            self._window_bits -= num_bits
+            return
+        bit_pos = self._pos * 8 - self._window_bits + num_bits
+        if bit_pos > len(self.data) * 8:
+            self._exhaust()
+            raise IndexError("Reading past end of data")
+        self._pos = bit_pos >> 3
+        self._window = 0
+        self._window_bits = 0
+        if bit_pos & 7:
+            self._refill(64)
+            self._window_bits -= bit_pos & 7
 
     def read_ue(self) -> int:
+        data_len = len(self.data)
+        if not self._window_bits and self._pos >= data_len:
+            return 0
+
+        # Count the zero prefix with bit_length() on the window instead of
+        # consuming it one bit at a time.
         leading_zeros = 0
-        while self.byte_pos < len(self.data) and self.read_bit() == 0:
-            leading_zeros += 1
-            if self.byte_pos >= len(self.data) and self.bit_pos == 0:
+        while True:
+            if self._window_bits < 64:
+                self._refill(64)
+            window = self._window & ((1 << self._window_bits) - 1)
+            if window:
                 break
-
-        if self.byte_pos >= len(self.data) and leading_zeros > 0:
+            if self._pos >= data_len:
+                self._exhaust()
+                raise IndexError("Reading past end of data while parsing Exp-Golomb")
+            leading_zeros += self._window_bits
+            self._window_bits = 0
+        length = window.bit_length()
+        leading_zeros += self._window_bits - length
+
+        # Step past the zero prefix and the terminating 1 bit.
+        self._window_bits = length - 1
+        if leading_zeros > 0 and not self._window_bits and self._pos >= data_len:
             raise IndexError("Reading past end of data while parsing Exp-Golomb")
 
         return (1 << leading_zeros) - 1 + self.read_bits(leading_zeros)
@@ -58,17 +130,65 @@ class BitReader:
     def read_se(self) -> int:
         value = self.read_ue()
         if value & 1:
-            return (value + 1) // 2
-        else:
-            return -1 * (value // 2)
+            return (value + 1) >> 1
+        return -(value >> 1)
 
     def byte_aligned(self) -> bool:
-        return self.bit_pos == 0
+        return not self._window_bits & 7
 
     def skip_to_next_byte(self):
-        if self.bit_pos != 0:
-            self.bit_pos = 0
-            self.byte_pos += 1
+        self._window_bits &= ~7
+
+
+class _BitstreamDetails:
+    """Fixed-field accumulator for parse_video_bitstream results."""
+
+    __slots__ = (
+        "hdr_format",
+        "color_primaries",
+        "transfer_characteristics",
+        "matrix_coefficients",
+        "color_space",
+        "color_transfer",
+        "color_range",
+        "max_content_light_level",
+        "max_frame_average_light_level",
+        "dolby_vision_profile",
+        "dolby_vision_level",
+        "video_full_range_flag",
+    )
+
+    def __init__(self):
+        self.hdr_format = "SDR"
+        self.color_primaries = "Unknown"
+        self.transfer_characteristics = "Unknown"
+        self.matrix_coefficients = "Unknown"
+        self.color_space = "Unknown"
+        self.color_transfer = "Unknown"
+        self.color_range = "Unknown"
+        self.max_content_light_level = None
+        self.max_frame_average_light_level = None
+        self.dolby_vision_profile = None
+        self.dolby_vision_level = None
+        self.video_full_range_flag = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "hdr_format": self.hdr_format,
+            "color_primaries": self.color_primaries,
+            "transfer_characteristics": self.transfer_characteristics,
+            "matrix_coefficients": self.matrix_coefficients,
+            "color_space": self.color_space,
+            "color_transfer": self.color_transfer,
+            "color_range": self.color_range,
+            "max_content_light_level": self.max_content_light_level,
+            "max_frame_average_light_level": self.max_frame_average_light_level,
+            "dolby_vision_profile": self.dolby_vision_profile,
+            "dolby_vision_level": self.dolby_vision_level,
+        }
+        if self.video_full_range_flag is not None:
+            result["video_full_range_flag"] = self.video_full_range_flag
+        return result
 
 
 class BitstreamParser:
@@ -84,61 +204,65 @@ class BitstreamParser:
         """
         Navigates the MP4 structure to find and extract the raw data of the first
         sample for a given index. This is essential for bitstream parsing.
+        The moov region is read once and walked by offset.
         """
         logger.debug(f"Attempting to extract first sample for track ID: {index}")
         f.seek(moov_start)
+        buf = f.read(max(0, moov_end - moov_start))
+        buf_end = len(buf)
 
-        while f.tell() < moov_end:
-            box_type, _, box_start, box_end = _read_box_header(f)
-            if not box_type:
-                break
-            if f.tell() > moov_end:
+        off = 0
+        while off < buf_end:
+            box_type, payload_start, box_end = _read_box_header_from_buffer(
+                buf, off, buf_end
+            )
+            if not box_type or box_end > buf_end:
                 break
 
-            if box_type == b"trak":
-                trak_start = f.tell() - 8
+            if box_type == b"moov":
+                off = payload_start
+                continue
 
-                is_correct_track = False
-                f.seek(trak_start)
-                while f.tell() < box_end:
-                    inner_type, _, _, inner_end = _read_box_header(f)
+            if box_type == b"trak":
+                found_id = None
+                inner_off = payload_start
+                while inner_off < box_end:
+                    inner_type, inner_payload, inner_end = _read_box_header_from_buffer(
+                        buf, inner_off, box_end
+                    )
                     if not inner_type or inner_end > box_end:
                         break
                     if inner_type == b"tkhd":
-                        f.read(8)  # version + flags
-                        version = _read_uint8(f)
-                        f.read(3)  # flags
-                        if version == 1:
-                            f.read(16)
-                            found_id = _read_uint32(f)
-                        elif version == 0:
-                            f.read(8)
-                            found_id = _read_uint32(f)
-                        else:
-                            found_id = None
-
-                        if found_id == index:
-                            is_correct_track = True
+                        if inner_payload < inner_end:
+                            version = buf[inner_payload]
+                            if version == 1:
+                                id_pos = inner_payload + 20
+                            elif version == 0:
+                                id_pos = inner_payload + 12
+                            else:
+                                id_pos = inner_end
+                            if id_pos + 4 <= inner_end:
+                                found_id = _U32.unpack_from(buf, id_pos)[0]
                         break
-                    f.seek(inner_end)
+                    inner_off = inner_end
 
-                if is_correct_track:
+                if found_id == index:
                     logger.debug(f"Found correct 'trak' for track ID {index}")
-                    f.seek(trak_start)
                     stbl_start, stbl_end = 0, 0
-                    current_pos_trak = trak_start
-                    while current_pos_trak < box_end:
-                        f.seek(current_pos_trak)
-                        b_type, _, b_start, b_end = _read_box_header(f)
+                    trak_off = payload_start
+                    while trak_off < box_end:
+                        b_type, b_payload, b_end = _read_box_header_from_buffer(
+                            buf, trak_off, box_end
+                        )
                         if not b_type or b_end > box_end:
                             break
                         if b_type == b"stbl":
-                            stbl_start, stbl_end = b_start, b_end
+                            stbl_start, stbl_end = b_payload, b_end
                             break
                         if b_type in (b"mdia", b"minf"):
-                            current_pos_trak = b_start
+                            trak_off = b_payload
                         else:
-                            current_pos_trak = b_end
+                            trak_off = b_end
 
                     if not stbl_start:
                         logger.error("Could not find 'stbl' box for the track.")
@@ -146,40 +270,50 @@ class BitstreamParser:
 
                     first_sample_size = None
                     first_chunk_offset = None
-                    f.seek(stbl_start)
-                    while f.tell() < stbl_end:
-                        stbl_box_type, _, stbl_box_start, stbl_box_end = (
-                            _read_box_header(f)
+                    stbl_off = stbl_start
+                    while stbl_off < stbl_end:
+                        stbl_box_type, stbl_payload, stbl_box_end = (
+                            _read_box_header_from_buffer(buf, stbl_off, stbl_end)
                         )
                         if not stbl_box_type or stbl_box_end > stbl_end:
                             break
 
+                        # Skip version + flags
+                        field_pos = stbl_payload + 4
                         if stbl_box_type == b"stsz":
-                            f.seek(stbl_box_start + 8)
-                            sample_size = _read_uint32(f)
-                            entry_count = _read_uint32(f)
-                            if sample_size == 0 and entry_count > 0:
-                                first_sample_size = _read_uint32(f)
-                            else:
-                                first_sample_size = sample_size
+                            if field_pos + 8 <= stbl_box_end:
+                                sample_size, entry_count = _U32_PAIR.unpack_from(
+                                    buf, field_pos
+                                )
+                                if sample_size == 0 and entry_count > 0:
+                                    if field_pos + 12 <= stbl_box_end:
+                                        first_sample_size = _U32.unpack_from(
+                                            buf, field_pos + 8
+                                        )[0]
+                                else:
+                                    first_sample_size = sample_size
                             logger.debug(
                                 f"Found first sample size: {first_sample_size}"
                             )
 
                         elif stbl_box_type == b"stco":
-                            f.seek(stbl_box_start + 8)
-                            entry_count = _read_uint32(f)
-                            if entry_count > 0:
-                                first_chunk_offset = _read_uint32(f)
+                            if field_pos + 8 <= stbl_box_end:
+                                entry_count, offset = _U32_PAIR.unpack_from(
+                                    buf, field_pos
+                                )
+                                if entry_count > 0:
+                                    first_chunk_offset = offset
                             logger.debug(
                                 f"Found 32-bit chunk offset: {first_chunk_offset}"
                             )
 
                         elif stbl_box_type == b"co64":
-                            f.seek(stbl_box_start + 8)
-                            entry_count = _read_uint32(f)
-                            if entry_count > 0:
-                                first_chunk_offset = _read_uint64(f)
+                            if field_pos + 12 <= stbl_box_end:
+                                entry_count = _U32.unpack_from(buf, field_pos)[0]
+                                if entry_count > 0:
+                                    first_chunk_offset = _U64.unpack_from(
+                                        buf, field_pos + 4
+                                    )[0]
                             logger.debug(
                                 f"Found 64-bit chunk offset: {first_chunk_offset}"
                             )
@@ -190,7 +324,7 @@ class BitstreamParser:
                         ):
                             break
 
-                        f.seek(stbl_box_end)
+                        stbl_off = stbl_box_end
 
                     if first_sample_size is not None and first_chunk_offset is not None:
                         try:
@@ -203,7 +337,7 @@ class BitstreamParser:
                             logger.error(f"Failed to seek/read sample data: {e}")
                             return None
 
-            f.seek(box_end)
+            off = box_end
 
         logger.warning(
             f"Could not find sample data for track ID {index}. 'trak' may not exist or parsing failed."
@@ -211,7 +345,7 @@ class BitstreamParser:
         return None
 
     @staticmethod
-    def _parse_vui_parameters(reader: BitReader, details: Dict[str, Any]):
+    def _parse_vui_parameters(reader: BitReader, details: _BitstreamDetails):
         """Parses VUI parameters from a video bitstream."""
         try:
             if reader.read_bit():  # aspect_ratio_info_present_flag
@@ -225,13 +359,13 @@ class BitstreamParser:
 
             if reader.read_bit():  # video_signal_type_present_flag
                 reader.read_bits(3)  # video_format
-                details["video_full_range_flag"] = reader.read_bit()
+                details.video_full_range_flag = reader.read_bit()
                 if reader.read_bit():  # colour_description_present_flag
-                    details["color_primaries"] = reader.read_bits(8)
-                    details["transfer_characteristics"] = reader.read_bits(8)
-                    details["matrix_coefficients"] = reader.read_bits(8)
+                    details.color_primaries = reader.read_bits(8)
+                    details.transfer_characteristics = reader.read_bits(8)
+                    details.matrix_coefficients = reader.read_bits(8)
                     logger.debug(
-                        f"VUI: Primaries: {details['color_primaries']}, Transfer: {details['transfer_characteristics']}, Matrix: {details['matrix_coefficients']}, Range: {details.get('video_full_range_flag')}"
+                        f"VUI: Primaries: {details.color_primaries}, Transfer: {details.transfer_characteristics}, Matrix: {details.matrix_coefficients}, Range: {details.video_full_range_flag}"
                     )
 
             if reader.read_bit():  # chroma_loc_info_present_flag
@@ -252,7 +386,7 @@ class BitstreamParser:
             logger.error(f"Error parsing VUI parameters: {e}")
 
     @staticmethod
-    def _parse_sps_payload(nal_payload: bytes, details: Dict[str, Any]):
+    def _parse_sps_payload(nal_payload: bytes, details: _BitstreamDetails):
         """
         Parses a SPS NAL unit payload to extract VUI parameters.
         This is a simplified implementation focusing only on VUI for color info.
@@ -260,22 +394,20 @@ class BitstreamParser:
         reader = BitReader(nal_payload)
 
         try:
-            reader.read_bits(4)
-            reader.read_bits(3)
+            reader.skip_bits(4)
+            reader.skip_bits(3)
             reader.read_bit()
 
-            reader.read_bits(2)
+            reader.skip_bits(2)
             reader.read_bit()
-            reader.read_bits(5)
+            reader.skip_bits(5)
 
-            reader.read_bits(32)
-            reader.read_bits(48)
+            reader.skip_bits(32)
+            reader.skip_bits(48)
 
-            reader.read_bits(8)
+            reader.skip_bits(8)
 
-            sps_max_sub_layers_minus1 = details.get("sps_max_sub_layers_minus1", 0)
-            for i in range(sps_max_sub_layers_minus1 + 1):
-                pass
+            sps_max_sub_layers_minus1 = 0
 
             reader.read_ue()
 
@@ -299,12 +431,15 @@ class BitstreamParser:
             reader.read_ue()
 
             sps_sub_layer_ordering_info_present_flag = reader.read_bit()
-            for i in range(sps_max_sub_layers_minus1 + 1):
+            reads = (
+                sps_max_sub_layers_minus1 + 1
+                if sps_sub_layer_ordering_info_present_flag
+                else 1
+            )
+            for _ in range(reads):
                 reader.read_ue()
                 reader.read_ue()
                 reader.read_ue()
-                if not sps_sub_layer_ordering_info_present_flag:
-                    break
 
             reader.read_ue()
             reader.read_ue()
@@ -321,8 +456,8 @@ class BitstreamParser:
             reader.read_bit()
             reader.read_bit()
             if reader.read_bit():
-                reader.read_bits(4)
-                reader.read_bits(4)
+                reader.skip_bits(4)
+                reader.skip_bits(4)
                 reader.read_ue()
                 reader.read_ue()
                 reader.read_bit()
@@ -356,53 +491,36 @@ class BitstreamParser:
         """
         Parses a video bitstream for SPS (VUI) and SEI messages containing HDR metadata.
         """
-        bitstream_details = {
-            "hdr_format": "SDR",
-            "color_primaries": "Unknown",
-            "transfer_characteristics": "Unknown",
-            "matrix_coefficients": "Unknown",
-            "color_space": "Unknown",
-            "color_transfer": "Unknown",
-            "color_range": "Unknown",
-            "max_content_light_level": None,
-            "max_frame_average_light_level": None,
-            "dolby_vision_profile": None,
-            "dolby_vision_level": None,
-        }
+        details = _BitstreamDetails()
 
         pos = 0
-        logger.debug(f"Parsing video bitstream from {len(data)} bytes")
-        while pos < len(data):
-            start_code_pos = -1
-            start_code_len = 0
-
-            if pos + 4 <= len(data) and data[pos : pos + 4] == b"\x00\x00\x00\x01":
-                start_code_pos = pos
-                start_code_len = 4
-            elif pos + 3 <= len(data) and data[pos : pos + 3] == b"\x00\x00\x01":
-                start_code_pos = pos
-                start_code_len = 3
-
+        data_len = len(data)
+        logger.debug(f"Parsing video bitstream from {data_len} bytes")
+        while pos < data_len:
+            start_code_pos = data.find(b"\x00\x00\x01", pos)
             if start_code_pos == -1:
-                pos += 1
-                continue
-
-            pos = start_code_pos + start_code_len
-            if pos + 2 > len(data):
+                break
+            nal_start = start_code_pos + 3
+            if start_code_pos > pos and data.startswith(
+                b"\x00\x00\x00\x01", start_code_pos - 1
+            ):
+                start_code_pos -= 1
+            pos = nal_start
+            if pos + 2 > data_len:
                 break
 
             nal_unit_type = (data[pos] >> 1) & 0x3F
 
-            next_start_code_pos = len(data)
-            temp_pos = pos + 2
-            while temp_pos < len(data) - 3:
-                if data[temp_pos : temp_pos + 4] == b"\x00\x00\x00\x01":
-                    next_start_code_pos = temp_pos
-                    break
-                elif data[temp_pos : temp_pos + 3] == b"\x00\x00\x01":
-                    next_start_code_pos = temp_pos
-                    break
-                temp_pos += 1
+            # A 4-byte start code is a 3-byte one preceded by a zero byte.
+            next_start_code_pos = data.find(b"\x00\x00\x01", pos + 2)
+            if next_start_code_pos == -1:
+                next_start_code_pos = data_len
+            elif next_start_code_pos > pos + 2 and data.startswith(
+                b"\x00\x00\x00\x01", next_start_code_pos - 1
+            ):
+                next_start_code_pos -= 1
+            elif next_start_code_pos >= data_len - 3:
+                next_start_code_pos = data_len
 
             nal_end = next_start_code_pos
             nal_payload = data[pos + 2 : nal_end]
@@ -413,45 +531,35 @@ class BitstreamParser:
 
             if nal_unit_type == 33:
                 logger.debug("Parsing SPS NAL unit.")
-                BitstreamParser._parse_sps_payload(nal_payload, bitstream_details)
+                BitstreamParser._parse_sps_payload(nal_payload, details)
 
-                if isinstance(bitstream_details.get("color_primaries"), int):
-                    bitstream_details["color_primaries"] = COLOR_PRIMARIES_MAP.get(
-                        bitstream_details["color_primaries"],
-                        f"Unknown ({bitstream_details['color_primaries']})",
+                if isinstance(details.color_primaries, int):
+                    details.color_primaries = COLOR_PRIMARIES_MAP.get(
+                        details.color_primaries,
+                        f"Unknown ({details.color_primaries})",
                     )
 
-                if isinstance(bitstream_details.get("transfer_characteristics"), int):
-                    bitstream_details["transfer_characteristics"] = (
-                        TRANSFER_CHARACTERISTICS_MAP.get(
-                            bitstream_details["transfer_characteristics"],
-                            f"Unknown ({bitstream_details['transfer_characteristics']})",
-                        )
+                if isinstance(details.transfer_characteristics, int):
+                    details.transfer_characteristics = TRANSFER_CHARACTERISTICS_MAP.get(
+                        details.transfer_characteristics,
+                        f"Unknown ({details.transfer_characteristics})",
                     )
 
-                if isinstance(bitstream_details.get("matrix_coefficients"), int):
-                    bitstream_details["matrix_coefficients"] = (
-                        MATRIX_COEFFICIENTS_MAP.get(
-                            bitstream_details["matrix_coefficients"],
-                            f"Unknown ({bitstream_details['matrix_coefficients']})",
-                        )
+                if isinstance(details.matrix_coefficients, int):
+                    details.matrix_coefficients = MATRIX_COEFFICIENTS_MAP.get(
+                        details.matrix_coefficients,
+                        f"Unknown ({details.matrix_coefficients})",
                     )
 
-                if isinstance(bitstream_details.get("video_full_range_flag"), int):
-                    bitstream_details["color_range"] = (
-                        "full"
-                        if bitstream_details["video_full_range_flag"] == 1
-                        else "tv"
+                if isinstance(details.video_full_range_flag, int):
+                    details.color_range = (
+                        "full" if details.video_full_range_flag == 1 else "tv"
                     )
 
-                if bitstream_details.get("matrix_coefficients") != "Unknown":
-                    bitstream_details["color_space"] = bitstream_details[
-                        "matrix_coefficients"
-                    ]
-                if bitstream_details.get("transfer_characteristics") != "Unknown":
-                    bitstream_details["color_transfer"] = bitstream_details[
-                        "transfer_characteristics"
-                    ]
+                if details.matrix_coefficients != "Unknown":
+                    details.color_space = details.matrix_coefficients
+                if details.transfer_characteristics != "Unknown":
+                    details.color_transfer = details.transfer_characteristics
 
             elif nal_unit_type in (39, 40):
                 logger.debug(f"Parsing SEI NAL unit (type {nal_unit_type}).")
@@ -489,58 +597,50 @@ class BitstreamParser:
                     try:
                         if payload_type == 137:
                             if len(current_payload_data) >= 24:
-                                bitstream_details["transfer_characteristics"] = (
-                                    "smpte2084"
-                                )
+                                details.transfer_characteristics = "smpte2084"
                                 if (
-                                    bitstream_details["color_primaries"] == "Unknown"
-                                    or bitstream_details["color_primaries"] == "bt709"
+                                    details.color_primaries == "Unknown"
+                                    or details.color_primaries == "bt709"
                                 ):
-                                    bitstream_details["color_primaries"] = "bt2020"
+                                    details.color_primaries = "bt2020"
                                 logger.debug(
                                     "Found Mastering Display Colour Volume (HDR10) SEI."
                                 )
                         elif payload_type == 144:
                             if len(current_payload_data) >= 4:
-                                max_cll, max_fall = struct.unpack(
-                                    ">HH", current_payload_data[:4]
-                                )
-                                bitstream_details["max_content_light_level"] = max_cll
-                                bitstream_details["max_frame_average_light_level"] = (
-                                    max_fall
+                                max_cll, max_fall = _U16_PAIR.unpack_from(
+                                    current_payload_data
                                 )
+                                details.max_content_light_level = max_cll
+                                details.max_frame_average_light_level = max_fall
                                 logger.debug(
                                     f"Found Content Light Level SEI: MaxCLL={max_cll}, MaxFALL={max_fall}"
                                 )
                         elif payload_type == 5:
-                            if (
-                                len(current_payload_data) > 16
-                                and current_payload_data[:12]
-                                == b"\x44\x4f\x56\x49\x03\x01\x01\x08\x00\x00\x00\x00"
+                            if len(
+                                current_payload_data
+                            ) > 16 and current_payload_data.startswith(
+                                b"\x44\x4f\x56\x49\x03\x01\x01\x08\x00\x00\x00\x00"
                             ):
                                 logger.debug(
                                     f"Raw Dolby Vision data (payload_type 5): {current_payload_data.hex()}"
                                 )
                                 if len(current_payload_data) >= 27:
                                     val = current_payload_data[25]
-                                    bitstream_details["dolby_vision_profile"] = (
-                                        val >> 1
-                                    ) & 0x7F
-                                    bitstream_details["dolby_vision_level"] = (
+                                    details.dolby_vision_profile = (val >> 1) & 0x7F
+                                    details.dolby_vision_level = (
                                         current_payload_data[26] & 0x3F
                                     )
-                                    bitstream_details["hdr_format"] = "Dolby Vision"
+                                    details.hdr_format = "Dolby Vision"
                                     logger.debug(
-                                        f"Found Dolby Vision SEI (heuristic): profile={bitstream_details['dolby_vision_profile']}, level={bitstream_details['dolby_vision_level']}"
+                                        f"Found Dolby Vision SEI (heuristic): profile={details.dolby_vision_profile}, level={details.dolby_vision_level}"
                                     )
                         elif payload_type == 147:
                             if len(current_payload_data) >= 1:
                                 transfer = current_payload_data[0]
                                 if transfer == 18:
-                                    bitstream_details["transfer_characteristics"] = (
-                                        "arib-std-b67"
-                                    )
-                                    bitstream_details["hdr_format"] = "HLG"
+                                    details.transfer_characteristics = "arib-std-b67"
+                                    details.hdr_format = "HLG"
                                     logger.debug(
                                         "Found Alternative Transfer Characteristics (HLG) SEI."
                                     )
@@ -552,19 +652,20 @@ class BitstreamParser:
                     sei_pos += payload_size
             pos = nal_end
 
-        if bitstream_details["dolby_vision_profile"] is not None:
-            bitstream_details["hdr_format"] = "Dolby Vision"
-            if bitstream_details["color_primaries"] == "Unknown":
-                bitstream_details["color_primaries"] = "bt2020"
-            if bitstream_details["transfer_characteristics"] == "Unknown":
-                bitstream_details["transfer_characteristics"] = "smpte2084"
-            if bitstream_details["matrix_coefficients"] == "Unknown":
-                bitstream_details["matrix_coefficients"] = "bt2020nc"
-
-        elif bitstream_details["transfer_characteristics"] == "arib-std-b67":
-            bitstream_details["hdr_format"] = "HLG"
-        elif bitstream_details["transfer_characteristics"] == "smpte2084":
-            bitstream_details["hdr_format"] = "HDR (PQ)"
-
+        if details.dolby_vision_profile is not None:
+            details.hdr_format = "Dolby Vision"
+            if details.color_primaries == "Unknown":
+                details.color_primaries = "bt2020"
+            if details.transfer_characteristics == "Unknown":
+                details.transfer_characteristics = "smpte2084"
+            if details.matrix_coefficients == "Unknown":
+                details.matrix_coefficients = "bt2020nc"
+
+        elif details.transfer_characteristics == "arib-std-b67":
+            details.hdr_format = "HLG"
+        elif details.transfer_characteristics == "smpte2084":
+            details.hdr_format = "HDR (PQ)"
+
+        bitstream_details = details.to_dict()
         logger.debug(f"Bitstream parsing result: {bitstream_details}")
         return bitstream_details
@@ -1,31 +1,327 @@
 # metaspector/format_handlers/mp4/mp4_boxes.py
 # !/usr/bin/env python3
 
+import copy
 import logging
+import os
 import plistlib
 import struct
-import io
+import threading
 
-from typing import Any, BinaryIO, Dict, Optional, Union, Tuple
+from typing import Any, BinaryIO, Dict, Optional, Set, Union, Tuple
 from .mp4_bitstream_parser import BitReader
 from .mp4_utils import (
     _decode_qt_language_code,
     _read_box_header,
+    _read_box_header_from_buffer,
+    _AtBoxEnd,
     _read_uint8,
-    _read_uint16,
-    _read_uint32,
-    _read_uint64,
+    _U8,
+    _U16,
+    _U32,
+    _U64,
     TRANSFER_CHARACTERISTICS_MAP,
     COLOR_PRIMARIES_MAP,
     MATRIX_COEFFICIENTS_MAP,
     _CHROMA_LOCATION_MAP,
     _AV1_CHROMA_LOCATION_MAP, _VP9_PROFILE_MAP, _AV1_PROFILE_MAP, _HEVC_PROFILE_MAP, _H264_PROFILE_MAP,
-    _COVER_ART_FORMAT_MAP, _SUBTITLE_CODEC_MAP, _AUDIO_CODEC_MAP, _VIDEO_CODEC_MAP
+    _COVER_ART_FORMAT_MAP,
+    _SUBTITLE_CODEC_BY_ENTRY_TYPE,
+    _AUDIO_CODEC_BY_ENTRY_TYPE,
+    _VIDEO_CODEC_BY_ENTRY_TYPE,
+    _PIX_FMT_BY_CHROMA,
+    _PIX_FMT_BY_CHROMA_DEPTH,
+    _AV1_PIX_FMT_TABLE,
+    _VP9_PIX_FMT_BY_CHROMA_DEPTH,
+    _ILST_KEY_MAP,
+    _HD_VIDEO_DEFINITION_MAP,
+    _RATING_UNIT_DEFINITION_MAP,
+    _RATING_UNIT_LEVEL_MAP,
+    _AAC_CHANNEL_CONFIG_MAP,
+    _AC3_CHANNEL_LAYOUTS,
+    _HDR_FORMAT_MAP,
+    _HDR_TRANSFERS,
+    _DOLBY_VISION_COLOR_DEFAULTS,
+    _DV_SDR_COMPATIBLE,
 )
 from ...matrices.rating_matrix import get_age_classification
 
 logger = logging.getLogger(__name__)
 
+_JPEG_SOF_DIMS = struct.Struct(">HH")
+_PNG_IHDR_DIMS = struct.Struct(">II")
+_TRKN = struct.Struct(">HHHH")
+_VPCC_EXTENDED = struct.Struct(">5B")
+_AUDIO_SAMPLE_ENTRY = struct.Struct(">16xHH4xI")
+_VISUAL_SAMPLE_DIMS = struct.Struct(">HH")
+
+# Every SOFn marker; DHT (C4), JPG (C8) and DAC (CC) share the range but are not frames.
+_JPEG_SOF_MARKERS = frozenset(
+    (*range(0xC0, 0xC4), *range(0xC5, 0xC8), *range(0xC9, 0xCC), *range(0xCD, 0xD0))
+)
+# Byte stuffing, TEM, RSTn and SOI carry no length field.
+_JPEG_STANDALONE_MARKERS = frozenset((0x00, 0x01, *range(0xD0, 0xD9)))
+
+_SUBTITLE_ENTRY_TYPES = frozenset(
+    (b"tx3g", b"mp4s", b"subp", b"clcp", b"text", b"c608")
+)
+_SUBTITLE_NAME_CHILD_TYPES = frozenset(
+    (b"\xa9nam", b"name", b"titl", b"desc", b"drmi", b"text", b"kind", b"uri ")
+)
+_UDTA_NAME_TYPES = frozenset((b"\xa9nam", b"name", b"titl"))
+_DOLBY_VISION_CONFIG_TYPES = frozenset((b"dvcC", b"dvvC"))
+_TRACK_DISC_TYPES = frozenset((b"trkn", b"disk"))
+
+# Keys removed from parse_stsd_video results when they do not apply.
+_VP9_INTERMEDIATE_KEYS = frozenset(("bit_depth", "chroma_subsampling"))
+_DOLBY_VISION_KEYS = frozenset(
+    (
+        "dolby_vision",
+        "dolby_vision_profile",
+        "dolby_vision_level",
+        "dolby_vision_sdr_compatible",
+    )
+)
+_COLOR_FIELD_KEYS = (
+    "color_primaries",
+    "transfer_characteristics",
+    "matrix_coefficients",
+    "color_space",
+    "color_transfer",
+    "color_range",
+)
+_SDR_COLOR_KEYS = frozenset(
+    ("color_primaries", "matrix_coefficients", "transfer_characteristics")
+)
+
+# Output key order for parse_ilst; keys not listed follow in parse order.
+_ILST_OUTPUT_ORDER = (
+    "title",
+    "artist",
+    "album",
+    "album_artist",
+    "track_number",
+    "track_total",
+    "disc_number",
+    "disc_total",
+    "genre",
+    "release_date",
+    "duration_seconds",
+    "tempo",
+    "publisher",
+    "record_company",
+    "copyright",
+    "isrc",
+    "barcode",
+    "upc",
+    "media_type",
+    "itunesadvisory",
+    "rating_system",
+    "rating_label",
+    "rating_age_classification",
+    "rating_unit",
+    "lyrics",
+    "comment",
+    "grouping",
+    "keywords",
+    "description",
+    "long_description",
+    "series_description",
+    "has_cover_art",
+    "cover_art_mime",
+    "cover_art_dimensions",
+    "encoder",
+    "encoded_by",
+    "language",
+    "compilation",
+    "gapless_playback",
+    "podcast",
+    "category",
+    "tv_show_name",
+    "tv_episode_id",
+    "tv_season",
+    "tv_episode_number",
+    "tv_network",
+    "hd_video",
+    "hd_video_definition",
+    "hd_video_definition_level",
+    "studio",
+    "content_id",
+    "composer",
+    "performer",
+    "directors",
+    "producers",
+    "screenwriters",
+    "cast",
+    "owner",
+)
+# Placeholder for output slots that no ilst item filled; None is a valid value.
+_UNSET = object()
+
+
+def _parse_int(text: str) -> Optional[int]:
+    """
+    Converts a signed decimal string like int() does, but returns None for
+    malformed text instead of raising. Underscore digit grouping is not accepted.
+    """
+    if text.isdecimal():
+        return int(text)
+    digits = text.strip()
+    if digits[:1] in ("+", "-"):
+        digits = digits[1:]
+    return int(text) if digits.isdecimal() else None
+
+
+def _store_ilst_number_pair(
+    key_name: str, value: Any, parsed_data: Dict[str, Any]
+) -> None:
+    """Splits an "N/M" track or disc value into its number and total."""
+    if isinstance(value, str) and "/" in value:
+        head, _, tail = value.partition("/")
+        num, total = _parse_int(head), _parse_int(tail)
+        if num is not None and total is not None:
+            parsed_data[key_name] = num
+            parsed_data[key_name.replace("_number", "_total")] = str(total)
+            return
+    parsed_data[key_name] = value
+
+
+def _store_ilst_hd_video(
+    key_name: str, value: Any, parsed_data: Dict[str, Any]
+) -> None:
+    """Expands the 'hdvd' level into a flag and a definition label."""
+    if parsed_data.get("media_type") == 1:
+        # Music files drop the HD fields afterwards; skip them if 'stik' came first.
+        return
+    if not isinstance(value, int):
+        parsed_data[key_name] = value
+        return
+    parsed_data[key_name] = bool(value)
+    parsed_data["hd_video_definition"] = _HD_VIDEO_DEFINITION_MAP.get(value, "SD")
+    parsed_data["hd_video_definition_level"] = value
+
+
+def _store_ilst_content_rating(
+    key_name: str, value: Any, parsed_data: Dict[str, Any]
+) -> None:
+    """Splits an iTunEXTC "system|label|unit|" rating string into its fields."""
+    parts = value.split("|") if isinstance(value, str) else ()
+    if len(parts) < 3:
+        parsed_data[key_name] = value
+        return
+    system = parts[0] if parts[0] else None
+    label = parts[1] if parts[1] else None
+    parsed_data["rating_system"] = system
+    parsed_data["rating_label"] = label
+    if system and label:
+        parsed_data["rating_age_classification"] = get_age_classification(system, label)
+
+    rating_unit = _parse_int(parts[2])
+    parsed_data["rating_unit"] = rating_unit
+    if rating_unit in _RATING_UNIT_DEFINITION_MAP:
+        parsed_data["hd_video_definition"] = _RATING_UNIT_DEFINITION_MAP[rating_unit]
+        # Map rating_unit to hdvd-style levels for consistency
+        parsed_data["hd_video_definition_level"] = _RATING_UNIT_LEVEL_MAP.get(
+            rating_unit
+        )
+
+
+def _store_ilst_advisory(
+    key_name: str, value: Any, parsed_data: Dict[str, Any]
+) -> None:
+    """Normalizes the 'rtng' advisory code to "0" (clean/none) or "1" (explicit)."""
+    if not isinstance(value, int):
+        parsed_data[key_name] = value
+    elif value in (0, 2):
+        parsed_data[key_name] = "0"
+    elif value in (1, 4):
+        parsed_data[key_name] = "1"
+    else:
+        parsed_data[key_name] = str(value)
+
+
+def _store_ilst_flag(key_name: str, value: Any, parsed_data: Dict[str, Any]) -> None:
+    """Stores integer flag atoms as booleans."""
+    parsed_data[key_name] = bool(value) if isinstance(value, int) else value
+
+
+# Keys whose values need more than a plain store in parse_ilst.
+_ILST_VALUE_HANDLERS = {
+    "track_number": _store_ilst_number_pair,
+    "disc_number": _store_ilst_number_pair,
+    "hd_video": _store_ilst_hd_video,
+    "content_rating": _store_ilst_content_rating,
+    "itunesadvisory": _store_ilst_advisory,
+    "compilation": _store_ilst_flag,
+    "gapless_playback": _store_ilst_flag,
+    "podcast": _store_ilst_flag,
+}
+
+# Parsed ilst results keyed by file identity and byte range, oldest first.
+_ILST_CACHE: Dict[Tuple, Dict[str, Any]] = {}
+_ILST_CACHE_SIZE = 256
+_ILST_CACHE_LOCK = threading.Lock()
+
+
+def _ilst_cache_key(
+    f: BinaryIO,
+    ilst_start: int,
+    ilst_end: int,
+    include_cover_dimensions: bool,
+    wanted_keys: Optional[Set[str]],
+) -> Optional[Tuple]:
+    """
+    Builds a cache key from the file's identity and modification stamps, or
+    returns None for streams that are not backed by a file descriptor.
+    st_ctime_ns is included because a same-size in-place edit can restore
+    st_mtime, but the change time cannot be reset from user space.
+    """
+    try:
+        st = os.fstat(f.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+    return (
+        st.st_dev,
+        st.st_ino,
+        st.st_size,
+        st.st_mtime_ns,
+        st.st_ctime_ns,
+        ilst_start,
+        ilst_end,
+        include_cover_dimensions,
+        frozenset(wanted_keys) if wanted_keys is not None else None,
+    )
+
+
+def _ilst_cache_get(cache_key: Optional[Tuple]) -> Optional[Dict[str, Any]]:
+    """Returns a deep copy of a cached ilst result and marks it most recently used."""
+    if cache_key is None:
+        return None
+    with _ILST_CACHE_LOCK:
+        cached = _ILST_CACHE.pop(cache_key, None)
+        if cached is None:
+            return None
+        _ILST_CACHE[cache_key] = cached
+    # Plist values are lists and dicts, so a shallow copy would share them.
+    return copy.deepcopy(cached)
+
+
+def _ilst_cache_put(cache_key: Optional[Tuple], metadata: Dict[str, Any]) -> None:
+    """Stores a deep copy of an ilst result, evicting the least recently used entry."""
+    if cache_key is None:
+        return
+    cached = copy.deepcopy(metadata)
+    with _ILST_CACHE_LOCK:
+        _ILST_CACHE[cache_key] = cached
+        if len(_ILST_CACHE) > _ILST_CACHE_SIZE:
+            del _ILST_CACHE[next(iter(_ILST_CACHE))]
+
+
+def clear_ilst_cache() -> None:
+    """Drops every cached ilst result."""
+    with _ILST_CACHE_LOCK:
+        _ILST_CACHE.clear()
+
 
 class MP4BoxParser:
     """
@@ -36,6 +332,36 @@ class MP4BoxParser:
     class _TrackCharacteristics:
         """Holds boolean flags for track characteristics from 'udta'."""
 
+        __slots__ = (
+            "main_program_content",
+            "auxiliary_content",
+            "original_content",
+            "describes_video_for_accessibility",
+            "enhances_speech_intelligibility",
+            "dubbed_translation",
+            "voice_over_translation",
+            "language_translation",
+            "forced_only",
+            "describes_music_and_sound",
+            "transcribes_spoken_dialog",
+            "easy_to_read",
+        )
+
+        _TAGC_ATTR_MAP: Dict[bytes, str] = {
+            b"public.main-program-content": "main_program_content",
+            b"public.auxiliary-content": "auxiliary_content",
+            b"public.original-content": "original_content",
+            b"public.accessibility.describes-video": "describes_video_for_accessibility",
+            b"public.accessibility.enhances-speech-intelligibility": "enhances_speech_intelligibility",
+            b"public.translation.dubbed": "dubbed_translation",
+            b"public.translation.voice-over": "voice_over_translation",
+            b"public.translation": "language_translation",
+            b"public.subtitles.forced-only": "forced_only",
+            b"public.accessibility.describes-music-and-sound": "describes_music_and_sound",
+            b"public.accessibility.transcribes-spoken-dialog": "transcribes_spoken_dialog",
+            b"public.easy-to-read": "easy_to_read",
+        }
+
         def __init__(self):
             self.main_program_content = False
             self.auxiliary_content = False
@@ -51,63 +377,49 @@ class MP4BoxParser:
             self.easy_to_read = False
 
         def update_from_tagc_value(self, text_value: str):
-            t = text_value.lower().strip()
-            if t == "public.main-program-content":
-                self.main_program_content = True
-            elif t == "public.auxiliary-content":
-                self.auxiliary_content = True
-            elif t == "public.original-content":
-                self.original_content = True
-            elif t == "public.accessibility.describes-video":
-                self.describes_video_for_accessibility = True
-            elif t == "public.accessibility.enhances-speech-intelligibility":
-                self.enhances_speech_intelligibility = True
-            elif t == "public.translation.dubbed":
-                self.dubbed_translation = True
-            elif t == "public.translation.voice-over":
-                self.voice_over_translation = True
-            elif t == "public.translation":
-                self.language_translation = True
-            elif t == "public.subtitles.forced-only":
-                self.forced_only = True
-            elif t == "public.accessibility.describes-music-and-sound":
-                self.describes_music_and_sound = True
-            elif t == "public.accessibility.transcribes-spoken-dialog":
-                self.transcribes_spoken_dialog = True
-            elif t == "public.easy-to-read":
-                self.easy_to_read = True
+            self.update_from_tagc_bytes(
+                text_value.encode("utf-8", errors="replace").strip().lower()
+            )
+
+        def update_from_tagc_bytes(self, raw_value: bytes):
+            """Sets the flag for an already stripped and lowercased 'tagc' payload."""
+            attr = self._TAGC_ATTR_MAP.get(raw_value)
+            if attr:
+                setattr(self, attr, True)
 
     @staticmethod
     def _read_mp4_descriptor_length(f: BinaryIO) -> int:
         """Reads a variable-length size value from an MPEG-4 descriptor."""
-        length = 0
-        for _ in range(4):  # The size value is encoded in at most 4 bytes
-            byte = _read_uint8(f)
-            if byte is None:
-                return 0
-            length = (length << 7) | (byte & 0x7F)
-            if not (byte & 0x80):  # The MSB of the last byte is 0
-                break
-        return length
+        pos = f.tell()
+        buf = f.read(4)  # The size value is encoded in at most 4 bytes
+        # Missing bytes are padded as continuation bytes so they never terminate.
+        word = int.from_bytes(buf + b"\x80" * (4 - len(buf)), "big")
+        stop_bits = ~word & 0x80808080  # The MSB of the last byte is 0
+        nbytes = (32 - stop_bits.bit_length()) // 8 + 1 if stop_bits else 4
+        if nbytes > len(buf):
+            return 0
+        if nbytes != len(buf):
+            f.seek(pos + nbytes)
+        word >>= (4 - nbytes) * 8
+        return (
+            (word & 0x7F)
+            | ((word >> 1) & 0x3F80)
+            | ((word >> 2) & 0x1FC000)
+            | ((word >> 3) & 0xFE00000)
+        )
 
     @staticmethod
     def _unescape_nal_payload(payload: bytes) -> bytes:
         """Removes emulation prevention bytes (0x03) from a NAL unit payload."""
-        res = bytearray()
-        i = 0
-        while i < len(payload):
-            if i + 2 < len(payload) and payload[i : i + 3] == b"\x00\x00\x03":
-                res.extend(b"\x00\x00")
-                i += 3
-            else:
-                res.append(payload[i])
-                i += 1
-        return bytes(res)
+        if payload.find(b"\x00\x00\x03") < 0:
+            return payload
+        # Non-overlapping left-to-right replacement matches the byte-wise scan.
+        return payload.replace(b"\x00\x00\x03", b"\x00\x00")
 
     @staticmethod
-    def _parse_avcC(f: BinaryIO, box_end: int) -> Optional[Dict[str, Any]]:
+    def _parse_avcC(data: bytes, start: int, end: int) -> Optional[Dict[str, Any]]:
         """
-        Parses an 'avcC' box to determine profile, level, pixel format, and chroma location from the first SPS.
+        Parses an 'avcC' box payload (data[start:end]) to determine profile, level, pixel format, and chroma location from the first SPS.
         """
         details: Dict[str, Any] = {
             "pixel_format": None,
@@ -115,18 +427,19 @@ class MP4BoxParser:
             "profile_level": None,
             "chroma_location": None,
         }
-        avcc_start = f.tell()
         try:
-            f.seek(avcc_start + 5)
-            num_sps = _read_uint8(f) & 0x1F
+            buf = data[start:end]
+            num_sps = buf[5] & 0x1F
             if num_sps == 0:
                 return None
 
-            sps_len = _read_uint16(f)
-            if sps_len is None or sps_len == 0:
+            if len(buf) < 8:
+                return None
+            sps_len = _U16.unpack_from(buf, 6)[0]
+            if sps_len == 0:
                 return None
 
-            sps_payload = f.read(sps_len)
+            sps_payload = buf[8 : 8 + sps_len]
             unescaped_sps = MP4BoxParser._unescape_nal_payload(sps_payload)
             reader = BitReader(unescaped_sps)
 
@@ -182,6 +495,13 @@ class MP4BoxParser:
                                     next_scale if next_scale != 0 else last_scale
                                 )
 
+            # Everything past this point is walked only to reach the VUI chroma location.
+            pixel_format = _PIX_FMT_BY_CHROMA_DEPTH.get((chroma_format_idc, bit_depth))
+            if pixel_format is None and chroma_format_idc in _PIX_FMT_BY_CHROMA:
+                # Depths beyond the table only come from malformed SPS data.
+                pixel_format = f"{_PIX_FMT_BY_CHROMA[chroma_format_idc]}{bit_depth}le"
+            details["pixel_format"] = pixel_format
+
             reader.read_ue()
             pic_order_cnt_type = reader.read_ue()
             if pic_order_cnt_type == 0:
@@ -209,14 +529,14 @@ class MP4BoxParser:
             if reader.read_bit():  # vui_parameters_present_flag
                 if reader.read_bit():
                     if reader.read_bits(8) == 255:
-                        reader.read_bits(32)
+                        reader.skip_bits(32)
                 if reader.read_bit():
                     reader.read_bit()
                 if reader.read_bit():
-                    reader.read_bits(3)
+                    reader.skip_bits(3)
                     reader.read_bit()
                     if reader.read_bit():
-                        reader.read_bits(24)
+                        reader.skip_bits(24)
                 if reader.read_bit():
                     top = reader.read_ue()
                     bottom = reader.read_ue()
@@ -229,24 +549,16 @@ class MP4BoxParser:
             if details["chroma_location"] is None and chroma_format_idc == 1:
                 details["chroma_location"] = "left"
 
-            pix_fmt_map = {0: "gray", 1: "yuv420p", 2: "yuv422p", 3: "yuv444p"}
-            pix_fmt_base = pix_fmt_map.get(chroma_format_idc)
-            if pix_fmt_base:
-                details["pixel_format"] = (
-                    f"{pix_fmt_base}{bit_depth}le" if bit_depth > 8 else pix_fmt_base
-                )
             return details
 
         except (IndexError, struct.error) as e:
             logger.debug(f"Error parsing avcC box: {e}")
             return None
-        finally:
-            f.seek(box_end)
 
     @staticmethod
-    def _parse_hvcC(f: BinaryIO, box_end: int) -> Optional[Dict[str, Any]]:
+    def _parse_hvcC(data: bytes, start: int, end: int) -> Optional[Dict[str, Any]]:
         """
-        Parses an 'hvcC' box to determine profile, profile_level, pixel format, and chroma location from the first SPS.
+        Parses an 'hvcC' box payload (data[start:end]) to determine profile, profile_level, pixel format, and chroma location from the first SPS.
         """
         details: Dict[str, Any] = {
             "pixel_format": None,
@@ -254,28 +566,28 @@ class MP4BoxParser:
             "profile_level": None,
             "chroma_location": None,
         }
-        hvcC_start = f.tell()
         try:
-            f.seek(hvcC_start + 22)
-            num_of_arrays = _read_uint8(f)
-            if num_of_arrays is None:
+            buf = data[start:end]
+            if len(buf) < 23:
                 return None
+            num_of_arrays = buf[22]
 
             sps_payload = None
+            pos = 23
             for _ in range(num_of_arrays):
-                array_info = _read_uint8(f)
-                nal_unit_type = array_info & 0x3F
-                num_nalus = _read_uint16(f)
-                if num_nalus is None:
-                    continue
+                nal_unit_type = buf[pos] & 0x3F
+                num_nalus = _U16.unpack_from(buf, pos + 1)[0]
+                pos += 3
                 for _ in range(num_nalus):
-                    nal_unit_len = _read_uint16(f)
-                    if nal_unit_len is None:
-                        continue
-                    if nal_unit_type == 33 and sps_payload is None:  # NAL_UNIT_SPS
-                        sps_payload = f.read(nal_unit_len)
-                    else:
-                        f.seek(nal_unit_len, 1)
+                    nal_unit_len = _U16.unpack_from(buf, pos)[0]
+                    pos += 2
+                    if nal_unit_type == 33:  # NAL_UNIT_SPS
+                        sps_payload = buf[pos : pos + nal_unit_len]
+                        break
+                    pos += nal_unit_len
+                if sps_payload is not None:
+                    # Only the first SPS is used; later arrays are not needed.
+                    break
 
             if sps_payload is None:
                 return None
@@ -284,18 +596,18 @@ class MP4BoxParser:
             reader = BitReader(unescaped_sps)
 
             reader.read_bits(16)  # Skip NAL Unit Header
-            reader.read_bits(4)
+            reader.skip_bits(4)
             sps_max_sub_layers_minus1 = reader.read_bits(3)
             reader.read_bit()
 
-            reader.read_bits(2)
+            reader.skip_bits(2)
             reader.read_bit()
             profile_idc = reader.read_bits(5)
             details["profile"] = _HEVC_PROFILE_MAP.get(
                 profile_idc, str(profile_idc)
             )
-            reader.read_bits(32)
-            reader.read_bits(48)
+            reader.skip_bits(32)
+            reader.skip_bits(48)
 
             level_idc = reader.read_bits(8)
             level = level_idc / 30.0 if level_idc > 0 else None
@@ -310,12 +622,12 @@ class MP4BoxParser:
                     sub_layer_profile_present_flag.append(reader.read_bit())
                     sub_layer_level_present_flag.append(reader.read_bit())
                 for _ in range(sps_max_sub_layers_minus1, 8):
-                    reader.read_bits(2)
+                    reader.skip_bits(2)
                 for i in range(sps_max_sub_layers_minus1):
                     if sub_layer_profile_present_flag[i]:
-                        reader.read_bits(88)
+                        reader.skip_bits(88)
                     if sub_layer_level_present_flag[i]:
-                        reader.read_bits(8)
+                        reader.skip_bits(8)
 
             reader.read_ue()
             chroma_format_idc = reader.read_ue()
@@ -331,6 +643,14 @@ class MP4BoxParser:
                 reader.read_ue()
 
             bit_depth = reader.read_ue() + 8
+
+            # Everything past this point is walked only to reach the VUI chroma location.
+            pixel_format = _PIX_FMT_BY_CHROMA_DEPTH.get((chroma_format_idc, bit_depth))
+            if pixel_format is None and chroma_format_idc in _PIX_FMT_BY_CHROMA:
+                # Depths beyond the table only come from malformed SPS data.
+                pixel_format = f"{_PIX_FMT_BY_CHROMA[chroma_format_idc]}{bit_depth}le"
+            details["pixel_format"] = pixel_format
+
             reader.read_ue()
             reader.read_ue()
 
@@ -368,7 +688,7 @@ class MP4BoxParser:
             reader.read_bit()
 
             if reader.read_bit():
-                reader.read_bits(8)
+                reader.skip_bits(8)
                 reader.read_ue()
                 reader.read_ue()
                 reader.read_bit()
@@ -400,14 +720,14 @@ class MP4BoxParser:
             if reader.read_bit():
                 if reader.read_bit():
                     if reader.read_bits(8) == 255:
-                        reader.read_bits(32)
+                        reader.skip_bits(32)
                 if reader.read_bit():
                     reader.read_bit()
                 if reader.read_bit():
-                    reader.read_bits(3)
+                    reader.skip_bits(3)
                     reader.read_bit()
                     if reader.read_bit():
-                        reader.read_bits(24)
+                        reader.skip_bits(24)
                 if reader.read_bit():
                     top_val = reader.read_ue()
                     bottom_val = reader.read_ue()
@@ -420,49 +740,33 @@ class MP4BoxParser:
             if details["chroma_location"] is None and chroma_format_idc == 1:
                 details["chroma_location"] = "left"
 
-            pix_fmt_map = {0: "gray", 1: "yuv420p", 2: "yuv422p", 3: "yuv444p"}
-            pix_fmt_base = pix_fmt_map.get(chroma_format_idc)
-            if pix_fmt_base:
-                details["pixel_format"] = (
-                    f"{pix_fmt_base}{bit_depth}le" if bit_depth > 8 else pix_fmt_base
-                )
             return details
 
         except (IndexError, struct.error) as e:
             logger.debug(f"Error parsing hvcC box: {e}")
             return None
-        finally:
-            f.seek(box_end)
 
     @staticmethod
-    def _parse_av1C(f: BinaryIO, box_end: int) -> Optional[Dict[str, Any]]:
-        """Parses an 'av1C' box to determine the profile, profile_level, pixel format, and chroma location."""
+    def _parse_av1C(data: bytes, start: int, end: int) -> Optional[Dict[str, Any]]:
+        """Parses an 'av1C' box payload (data[start:end]) to determine the profile, profile_level, pixel format, and chroma location."""
         details: Dict[str, Any] = {
             "pixel_format": None,
             "profile": None,
             "profile_level": None,
             "chroma_location": None,
         }
-        av1c_start = f.tell()
         try:
-            av1c_data = f.read(box_end - av1c_start)
+            av1c_data = data[start:end]
             if len(av1c_data) < 4:
                 return None
 
-            reader = BitReader(av1c_data)
-            reader.read_bits(1)  # marker (1)
-            reader.read_bits(7)  # version (7)
-
-            seq_profile = reader.read_bits(3)
-            seq_level_idx_0 = reader.read_bits(5)
-            seq_tier_0 = reader.read_bits(1)
+            # Byte 0 is marker (1) + version (7); the fields below are byte aligned.
+            seq_profile = av1c_data[1] >> 5
+            seq_level_idx_0 = av1c_data[1] & 0x1F
 
-            high_bitdepth = reader.read_bits(1)
-            twelve_bit = reader.read_bits(1)
-            mono_chrome = reader.read_bits(1)
-            chroma_subsampling_x = reader.read_bits(1)
-            chroma_subsampling_y = reader.read_bits(1)
-            chroma_sample_position = reader.read_bits(2)
+            flags = av1c_data[2]
+            seq_tier_0 = flags >> 7
+            chroma_sample_position = flags & 0x03
 
             details["profile"] = _AV1_PROFILE_MAP.get(
                 seq_profile, str(seq_profile)
@@ -476,26 +780,8 @@ class MP4BoxParser:
                 tier_str = " (High)" if seq_tier_0 == 1 else ""
                 details["profile_level"] = f"{level:.1f}{tier_str}"
 
-            bit_depth = 8
-            if high_bitdepth:
-                bit_depth = 12 if twelve_bit else 10
-
-            if mono_chrome:
-                pix_fmt_base = "gray"
-            else:
-                if chroma_subsampling_x == 1 and chroma_subsampling_y == 1:
-                    pix_fmt_base = "yuv420p"
-                elif chroma_subsampling_x == 1 and chroma_subsampling_y == 0:
-                    pix_fmt_base = "yuv422p"
-                elif chroma_subsampling_x == 0 and chroma_subsampling_y == 0:
-                    pix_fmt_base = "yuv444p"
-                else:
-                    pix_fmt_base = None
-
-            if pix_fmt_base:
-                details["pixel_format"] = (
-                    f"{pix_fmt_base}{bit_depth}le" if bit_depth > 8 else pix_fmt_base
-                )
+            # Bit depth, monochrome and subsampling flags resolve in one lookup.
+            details["pixel_format"] = _AV1_PIX_FMT_TABLE[(flags >> 2) & 0x1F]
 
             details["chroma_location"] = _AV1_CHROMA_LOCATION_MAP.get(
                 chroma_sample_position, "unspecified"
@@ -504,46 +790,40 @@ class MP4BoxParser:
             return details
         except (IndexError, struct.error):
             return None
-        finally:
-            f.seek(box_end)
 
     @staticmethod
-    def _parse_vpc_config(f: BinaryIO, box_end: int) -> Dict[str, Any]:
+    def _parse_vpc_config(data: bytes, start: int, end: int) -> Dict[str, Any]:
         """
-        Parses a VP9 configuration box ('vpcC') to extract codec metadata.
+        Parses a VP9 configuration box ('vpcC') payload (data[start:end]) to extract codec metadata.
         This parser handles the mandatory profile and optional extended fields for
         level, bit depth, chroma subsampling, and color information.
         """
         config: Dict[str, Any] = {}
-        vpcc_start = f.tell()
         try:
             # A 'vpcC' box must contain at least the 1-byte profile.
-            if box_end - vpcc_start < 1:
+            if end - start < 1:
                 logger.warning("Invalid 'vpcC' box size: too small.")
                 return {}
 
-            profile = _read_uint8(f)
-            if profile is None:
-                return {}
+            # A payload cut short by the end of the file raises struct.error and yields {} below.
+            vpcc_data = data[start:end]
+            profile = _U8.unpack_from(vpcc_data)[0]
             config["profile"] = _VP9_PROFILE_MAP.get(profile, str(profile))
 
             # The presence of at least 5 more bytes indicates the extended configuration.
-            if box_end - f.tell() >= 5:
-                level = _read_uint8(f)
-                if level is not None:
-                    # Level is stored as an integer (e.g., 21 for level 2.1).
-                    config["profile_level"] = f"{level / 10.0:.1f}"
-
-                packed_byte = _read_uint8(f)
-                if packed_byte is not None:
-                    # Bits 4-7: bitDepth
-                    config["bit_depth"] = (packed_byte >> 4) & 0x0F
-                    # Bits 1-3: chromaSubsampling
-                    config["chroma_subsampling"] = (packed_byte >> 1) & 0x07
-
-                config["color_primaries"] = _read_uint8(f)
-                config["transfer_characteristics"] = _read_uint8(f)
-                config["matrix_coefficients"] = _read_uint8(f)
+            if end - start >= 6:
+                level, packed_byte, primaries, transfer, matrix = (
+                    _VPCC_EXTENDED.unpack_from(vpcc_data, 1)
+                )
+                # Level is stored as an integer (e.g., 21 for level 2.1).
+                config["profile_level"] = f"{level / 10.0:.1f}"
+                # Bits 4-7: bitDepth
+                config["bit_depth"] = (packed_byte >> 4) & 0x0F
+                # Bits 1-3: chromaSubsampling
+                config["chroma_subsampling"] = (packed_byte >> 1) & 0x07
+                config["color_primaries"] = primaries
+                config["transfer_characteristics"] = transfer
+                config["matrix_coefficients"] = matrix
             else:
                 # Infer details from profile if extended fields are absent.
                 # Profile 2 is 10-bit; others are 8-bit.
@@ -557,44 +837,56 @@ class MP4BoxParser:
                 config["chroma_location"] = "unspecified"
 
             return config
-        except (IOError, struct.error) as e:
+        except struct.error as e:
             # A warning is appropriate as malformed data can occur in practice.
             logger.warning(f"Could not parse 'vpcC' box due to an error: {e}")
             return {}
-        finally:
-            # Ensure the stream position is advanced to the end of the box.
-            f.seek(box_end)
 
     @staticmethod
     def parse_tkhd(f: BinaryIO, box_end: int) -> Optional[int]:
         """Parses 'tkhd' box to get index."""
-        version = _read_uint8(f)
-        f.read(3)
+        version_and_flags = f.read(4)
+        version = version_and_flags[0] if version_and_flags else None
+        index = None
         if version == 1:
-            f.read(16)
-            index = _read_uint32(f)
+            buf = f.read(20)
+            if len(buf) == 20:
+                index = _U32.unpack_from(buf, 16)[0]
         elif version == 0:
-            f.read(8)
-            index = _read_uint32(f)
-        else:
-            index = None
+            buf = f.read(12)
+            if len(buf) == 12:
+                index = _U32.unpack_from(buf, 8)[0]
         f.seek(box_end)
         return index
 
+    @staticmethod
+    def _unpack_timescale_duration(
+        buf: bytes, skip: int, duration_struct: struct.Struct
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """Unpacks timescale and duration from a version-specific header block."""
+        if len(buf) >= skip + 4 + duration_struct.size:
+            return (
+                _U32.unpack_from(buf, skip)[0],
+                duration_struct.unpack_from(buf, skip + 4)[0],
+            )
+        if len(buf) >= skip + 4:
+            return _U32.unpack_from(buf, skip)[0], None
+        return None, None
+
     @staticmethod
     def parse_mvhd(f: BinaryIO, box_end: int) -> Dict[str, Any]:
         """Parses 'mvhd' box to get the overall movie duration and timescale."""
         details = {"timescale": None, "duration": None}
-        version = _read_uint8(f)
-        f.read(3)
+        version_and_flags = f.read(4)
+        version = version_and_flags[0] if version_and_flags else None
         if version == 1:
-            f.read(16)
-            details["timescale"] = _read_uint32(f)
-            details["duration"] = _read_uint64(f)
+            details["timescale"], details["duration"] = (
+                MP4BoxParser._unpack_timescale_duration(f.read(28), 16, _U64)
+            )
         elif version == 0:
-            f.read(8)
-            details["timescale"] = _read_uint32(f)
-            details["duration"] = _read_uint32(f)
+            details["timescale"], details["duration"] = (
+                MP4BoxParser._unpack_timescale_duration(f.read(16), 8, _U32)
+            )
 
         f.seek(box_end)
         return details
@@ -603,22 +895,24 @@ class MP4BoxParser:
     def parse_mdhd(f: BinaryIO, box_end: int) -> Dict[str, Any]:
         """Parses 'mdhd' box to get timescale, duration, and language code."""
         details = {"timescale": None, "duration": None, "lang": "und"}
-        version = _read_uint8(f)
-        f.read(3)
+        version_and_flags = f.read(4)
+        version = version_and_flags[0] if version_and_flags else None
         if version == 1:
-            f.read(16)
-            details["timescale"] = _read_uint32(f)
-            details["duration"] = _read_uint64(f)
+            buf = f.read(30)
+            details["timescale"], details["duration"] = (
+                MP4BoxParser._unpack_timescale_duration(buf, 16, _U64)
+            )
         elif version == 0:
-            f.read(8)
-            details["timescale"] = _read_uint32(f)
-            details["duration"] = _read_uint32(f)
+            buf = f.read(18)
+            details["timescale"], details["duration"] = (
+                MP4BoxParser._unpack_timescale_duration(buf, 8, _U32)
+            )
         else:
             f.seek(box_end)
             return details
 
-        lang_and_quality = _read_uint16(f)
-        if lang_and_quality is not None:
+        if len(buf) == (30 if version == 1 else 18):
+            lang_and_quality = _U16.unpack_from(buf, len(buf) - 2)[0]
             details["lang"] = _decode_qt_language_code(lang_and_quality & 0x7FFF)
         f.seek(box_end)
         return details
@@ -631,9 +925,10 @@ class MP4BoxParser:
         f.read(12)
         name_data = f.read(box_end - f.tell())
         handler_name = (
-            name_data.decode("utf-8", errors="replace").rstrip("\x00").strip()
+            name_data.rstrip(b"\x00").decode("utf-8", errors="replace").strip()
         )
-        f.seek(box_end)
+        if f.tell() != box_end:
+            f.seek(box_end)
         return {"type": handler_type, "name": handler_name}
 
     @staticmethod
@@ -641,7 +936,7 @@ class MP4BoxParser:
         """Parses 'elng' box for extended language tag."""
         f.seek(4, 1)
         raw_data = f.read(box_end - f.tell())
-        text = raw_data.decode("utf-8", errors="replace").split("\x00", 1)[0].strip()
+        text = raw_data.partition(b"\x00")[0].decode("utf-8", errors="replace").strip()
         return text if text else None
 
     @staticmethod
@@ -655,53 +950,50 @@ class MP4BoxParser:
         """
         flags = MP4BoxParser._TrackCharacteristics()
         name: Optional[str] = None
-        current_pos = f.tell()
+        udta_size = udta_end - f.tell()
+        buf = f.read(udta_size)
+        off = 0
 
-        while current_pos < udta_end:
-            f.seek(current_pos)
-            box_type, _, box_start, box_end = _read_box_header(f)
-            if not box_type or box_end > udta_end:
+        while off < udta_size:
+            box_type, payload_start, box_end = _read_box_header_from_buffer(
+                buf, off, udta_size
+            )
+            if not box_type or box_end > udta_size:
                 break
 
             if box_type == b"tagc":
-                tagc_str = (
-                    f.read(box_end - f.tell()).decode("utf-8", errors="replace").strip()
-                )
-                flags.update_from_tagc_value(tagc_str)
-            elif box_type in (b"\xa9nam", b"name", b"titl") and name is None:
-                f.seek(box_start + 8)
-                potential_name = MP4BoxParser.parse_qtss(f, box_end)
+                flags.update_from_tagc_bytes(buf[payload_start:box_end].strip().lower())
+            elif box_type in _UDTA_NAME_TYPES and name is None:
+                potential_name = MP4BoxParser._decode_qtss(buf[payload_start:box_end])
                 if potential_name:
                     name = potential_name
 
-            current_pos = box_end
+            off = box_end
 
-        f.seek(udta_end)
+        if f.tell() != udta_end:
+            f.seek(udta_end)
         return flags, name
 
     @staticmethod
-    def parse_qtss(f: BinaryIO, box_end: int) -> Optional[str]:
-        """Parses a QuickTime-style string metadata atom."""
-        current_pos = f.tell()
-        if box_end - current_pos >= 4:
-            peek_byte = f.read(1)
-            f.seek(current_pos)
-            if peek_byte == b"\x00":
-                f.read(4)
-                current_pos = f.tell()
-
-        string_data_length = box_end - current_pos
-        if string_data_length <= 0:
+    def _decode_qtss(data: bytes) -> Optional[str]:
+        """Decodes the payload of a QuickTime-style string metadata atom."""
+        if len(data) >= 4 and data[0] == 0:
+            data = data[4:]
+        if not data:
             return None
-
-        raw_string_data = f.read(string_data_length)
         decoded_string = (
-            raw_string_data.decode("utf-8", errors="replace")
-            .split("\x00", 1)[0]
-            .strip()
+            data.partition(b"\x00")[0].decode("utf-8", errors="replace").strip()
         )
         return decoded_string if decoded_string else None
 
+    @staticmethod
+    def parse_qtss(f: BinaryIO, box_end: int) -> Optional[str]:
+        """Parses a QuickTime-style string metadata atom."""
+        remaining = box_end - f.tell()
+        if remaining <= 0:
+            return None
+        return MP4BoxParser._decode_qtss(f.read(remaining))
+
     @staticmethod
     def parse_itunes_data(
         f: BinaryIO, box_end: int, item_type: bytes
@@ -716,44 +1008,41 @@ class MP4BoxParser:
             f.seek(box_end)
             return None
 
-        value_format_indicator = _read_uint32(f)
-        f.read(4)  # Skip 4 bytes of unknown purpose
-
-        data_length = box_end - f.tell()
-        if data_length < 0:
+        payload = f.read(box_end - data_start)
+        if f.tell() != box_end:
             f.seek(box_end)
-            return None
+        return MP4BoxParser._decode_itunes_data(payload, item_type)
 
-        raw_data = f.read(data_length)
-        f.seek(box_end)
-
-        if not raw_data:
+    @staticmethod
+    def _decode_itunes_data(payload: bytes, item_type: bytes) -> Union[str, int, None]:
+        """
+        Decodes the payload of an iTunes 'data' atom: a 4-byte type indicator,
+        4 reserved bytes, then the value itself.
+        """
+        if len(payload) <= 8:
             return None
 
+        value_format_indicator = _U32.unpack_from(payload)[0]
+        raw_data = payload[8:]
+
         try:
             if value_format_indicator == 1:  # UTF-8 String
-                return raw_data.decode("utf-8", "replace").strip("\x00").strip()
-
-            if item_type in (b"trkn", b"disk"):
-                if len(raw_data) >= 4 and len(raw_data) <= 8:
-                    current_num = (
-                        int.from_bytes(raw_data[2:4], "big")
-                        if len(raw_data) >= 4
-                        else None
-                    )
-                    total_num = (
-                        int.from_bytes(raw_data[4:6], "big")
-                        if len(raw_data) >= 6
-                        else None
+                return raw_data.strip(b"\x00").decode("utf-8", "replace").strip()
+
+            # BE signed integer, used by most numeric atoms (tmpo, stik, rtng, cpil, hdvd...).
+            if value_format_indicator == 21 and item_type not in _TRACK_DISC_TYPES:
+                return int.from_bytes(raw_data, "big", signed=True)
+
+            if item_type in _TRACK_DISC_TYPES:
+                if 4 <= len(raw_data) <= 8:
+                    # A lone fifth byte is not a complete total; drop it before padding.
+                    padded = (raw_data if len(raw_data) >= 6 else raw_data[:4]).ljust(
+                        8, b"\x00"
                     )
-                    if (
-                        current_num is not None
-                        and total_num is not None
-                        and total_num > 0
-                    ):
+                    _, current_num, total_num, _ = _TRKN.unpack(padded)
+                    if total_num > 0:
                         return f"{current_num}/{total_num}"
-                    elif current_num is not None:
-                        return str(current_num)
+                    return str(current_num)
                 return int.from_bytes(raw_data, "big", signed=True)
 
             if value_format_indicator in (0, 65, 74, 75, 76):
@@ -773,207 +1062,202 @@ class MP4BoxParser:
 
     @staticmethod
     def _get_image_dimensions(
-        image_data: bytes, mime_type: str
+        image_data: bytes, mime_type: str, start: int = 0, end: Optional[int] = None
     ) -> Optional[Tuple[int, int]]:
         """
         Safely extracts image dimensions from raw image data without full decoding.
-        Supports JPEG and PNG.
+        Supports JPEG and PNG. The image may be the [start, end) slice of a larger
+        buffer, which is scanned in place.
         """
-        if not image_data:
+        data_len = len(image_data) if end is None else min(end, len(image_data))
+        if data_len <= start:
             return None
 
         if mime_type == "image/jpeg":
-            # JPEG: Find the Start of Frame marker (0xFFC0, 0xFFC1, 0xFFC2, or 0xFFC3)
-            # and read the 16-bit height and width fields.
-            try:
-                data_stream = io.BytesIO(image_data)
-                while True:
-                    marker_byte = data_stream.read(1)
-                    if not marker_byte:
+            # JPEG: Find the Start of Frame marker (any SOFn, baseline through
+            # lossless and arithmetic-coded) and read the 16-bit height and width fields.
+            # Marker candidates are located with bytes.find; segments that carry a
+            # length field are skipped whole so embedded thumbnails are not matched.
+            pos = start
+            while True:
+                marker_pos = image_data.find(b"\xff", pos, data_len)
+                if marker_pos < 0 or marker_pos + 1 >= data_len:
+                    break
+                marker = image_data[marker_pos + 1]
+                if marker in _JPEG_SOF_MARKERS:
+                    # Skip length and precision
+                    if marker_pos + 9 > data_len:
+                        logger.debug("Failed to parse JPEG dimensions: truncated SOF")
                         break
-                    if marker_byte == b"\xff":
-                        marker = data_stream.read(1)
-                        if marker in (b"\xc0", b"\xc1", b"\xc2", b"\xc3"):
-                            data_stream.read(3)  # Skip length and precision
-                            height = struct.unpack(">H", data_stream.read(2))[0]
-                            width = struct.unpack(">H", data_stream.read(2))[0]
-                            return width, height
-                        elif marker == b"\xd9":  # End of Image
-                            break
-            except (IOError, struct.error) as e:
-                logger.debug(f"Failed to parse JPEG dimensions: {e}")
+                    height, width = _JPEG_SOF_DIMS.unpack_from(
+                        image_data, marker_pos + 5
+                    )
+                    return width, height
+                elif marker == 0xD9:  # End of Image
+                    break
+                elif marker == 0xFF:  # Fill byte
+                    pos = marker_pos + 1
+                elif marker in _JPEG_STANDALONE_MARKERS or marker_pos + 4 > data_len:
+                    pos = marker_pos + 2
+                else:
+                    pos = (
+                        marker_pos + 2 + _U16.unpack_from(image_data, marker_pos + 2)[0]
+                    )
             return None
 
         elif mime_type == "image/png":
             # PNG: The IHDR chunk contains the width and height at fixed offsets.
             # IHDR is always the first chunk after the 8-byte signature.
-            if len(image_data) > 24 and image_data[12:16] == b"IHDR":
-                try:
-                    width = struct.unpack(">I", image_data[16:20])[0]
-                    height = struct.unpack(">I", image_data[20:24])[0]
-                    return width, height
-                except struct.error as e:
-                    logger.debug(f"Failed to parse PNG dimensions: {e}")
+            if data_len - start > 24 and image_data.startswith(b"IHDR", start + 12):
+                # The length check above guarantees both fields are present.
+                return _PNG_IHDR_DIMS.unpack_from(image_data, start + 16)
             return None
 
         return None
 
     @staticmethod
     def parse_ilst(
-            f: BinaryIO, ilst_end: int
+        f: BinaryIO,
+        ilst_end: int,
+        include_cover_dimensions: bool = True,
+        wanted_keys: Optional[Set[str]] = None,
+        use_cache: bool = True,
     ) -> Dict[str, Union[str, int, Dict[str, Any], None]]:
         """
         Parses the 'ilst' (item list) atom, which contains individual metadata items.
         It maps common iTunes metadata keys, processes them, and now parses embedded
         XML plists for rich movie metadata, skipping any truncated entries.
+        Cover art dimensions are only read when include_cover_dimensions is set.
+        When wanted_keys is given, parsing stops as soon as all of them are found.
+        Results for unchanged on-disk files are served from a small cache
+        unless use_cache is False.
+        """
+        ilst_start = f.tell()
+        # Read the whole item list once and walk its boxes by offset.
+        buf = f.read(max(ilst_end - ilst_start, 0))
+        metadata = MP4BoxParser._parse_ilst_items_cached(
+            f,
+            buf,
+            0,
+            ilst_end - ilst_start,
+            ilst_start,
+            include_cover_dimensions,
+            wanted_keys,
+            use_cache,
+        )
+        if f.tell() != ilst_end:
+            f.seek(ilst_end)
+        return metadata
+
+    @staticmethod
+    def _parse_ilst_items_cached(
+        f: BinaryIO,
+        buf: bytes,
+        start: int,
+        end: int,
+        buf_offset: int,
+        include_cover_dimensions: bool,
+        wanted_keys: Optional[Set[str]],
+        use_cache: bool,
+    ) -> Dict[str, Union[str, int, Dict[str, Any], None]]:
         """
-        parsed_data: Dict[str, Union[str, int, Dict[str, Any], None]] = {}
+        Returns the parsed items of the 'ilst' in buf[start:end], consulting the
+        ilst cache first when use_cache is set. buf_offset is the file position
+        of buf[0].
+        """
+        cache_key = (
+            _ilst_cache_key(
+                f,
+                buf_offset + start,
+                buf_offset + end,
+                include_cover_dimensions,
+                wanted_keys,
+            )
+            if use_cache
+            else None
+        )
+        metadata = _ilst_cache_get(cache_key)
+        if metadata is None:
+            metadata = MP4BoxParser._parse_ilst_items(
+                buf, start, end, include_cover_dimensions, wanted_keys
+            )
+            _ilst_cache_put(cache_key, metadata)
+        return metadata
+
+    @staticmethod
+    def _parse_ilst_items(
+        buf: bytes,
+        start: int,
+        end: int,
+        include_cover_dimensions: bool,
+        wanted_keys: Optional[Set[str]],
+    ) -> Dict[str, Union[str, int, Dict[str, Any], None]]:
+        """Walks the 'ilst' children in buf[start:end] and builds the ordered metadata dict."""
+        # Pre-populated in output order so the dict is sized once; unset slots
+        # are dropped at the end and unlisted keys follow in parse order.
+        parsed_data: Dict[str, Any] = dict.fromkeys(_ILST_OUTPUT_ORDER, _UNSET)
         has_cover_art = False
-        current_pos = f.tell()
-
-        key_map = {
-            b"\xa9nam": "title",
-            b"\xa9ART": "artist",
-            b"\xa9alb": "album",
-            b"\xa9cmt": "comment",
-            b"\xa9day": "release_date",
-            b"\xa9gen": "genre",
-            b"\xa9too": "encoder",
-            b"\xa9wrt": "composer",
-            b"trkn": "track_number",
-            b"disk": "disc_number",
-            b"gnre": "genre_id",
-            b"covr": "cover_art",
-            b"rtng": "itunesadvisory",
-            b"cpil": "compilation",
-            b"pgap": "gapless_playback",
-            b"shwm": "show_name",
-            b"eply": "episode_id",
-            b"tvsn": "tv_season",
-            b"tves": "tv_episode_number",
-            b"tven": "tv_episode_id",
-            b"desc": "description",
-            b"ldes": "long_description",
-            b"sdes": "series_description",
-            b"pcst": "podcast",
-            b"purl": "podcast_url",
-            b"egid": "episode_guid",
-            b"keyw": "keywords",
-            b"catg": "category",
-            b"hdvd": "hd_video",
-            b"stik": "media_type",
-            b"purd": "purchase_date",
-            b"cprt": "copyright",
-            b"akID": "apple_store_id",
-            b"cnID": "content_id",
-            b"geid": "genre_id_2",
-            b"plID": "playlist_id",
-            b"atID": "artist_id",
-            b"alID": "album_id",
-            b"cmID": "composer_id",
-            b"xid ": "external_id",
-            b"soal": "sort_album",
-            b"soar": "sort_artist",
-            b"soco": "sort_composer",
-            b"sonm": "sort_name",
-            b"sosn": "sort_show",
-            b"sotp": "sort_title",
-            b"aART": "album_artist",
-            b"\xa9grp": "grouping",
-            b"tmpo": "tempo",
-            b"tvnn": "tv_network",
-            b"stvd": "studio",
-            b"cast": "cast",
-            b"dirc": "directors",
-            b"codr": "codirector",
-            b"prod": "producers",
-            b"exec": "executive_producer",
-            b"swnm": "screenwriters",
-            b"\xa9lyr": "lyrics",
-            b"\xa9enc": "encoded_by",
-            b"apID": "itunes_account",
-            b"sfID": "itunes_country",
-            b"ardr": "art_director",
-            b"arrn": "arranger",
-            b"\xa9aut": "lyricist",
-            b"ackn": "acknowledgement",
-            b"\xa9con": "conductor",
-            b"\xa9lin": "linear_notes",
-            b"\xa9mak": "record_company",
-            b"\xa9ope": "original_artist",
-            b"\xa9phg": "phonogram_rights",
-            b"\xa9prd": "song_producer",
-            b"perf": "performer",
-            b"\xa9pub": "publisher",
-            b"seng": "sound_engineer",
-            b"solo": "soloist",
-            b"crdt": "credits",
-            b"\xa9wrk": "work_name",
-            b"\xa9mvn": "movement_name",
-            b"\xa9mvi": "movement_number",
-            b"\xa9mvc": "movement_count",
-            b"shwv": "show_work_and_movement",
-            b"soaa": "sort_album_artist",
-            b"tvsh": "tv_show_name",
-            b"----": "content_rating",
-            b"ownr": "owner",
-        }
+        buf_end = end
+        current_pos = start
 
-        while current_pos < ilst_end:
-            f.seek(current_pos)
-            item_type, _, item_start, item_end = _read_box_header(f)
-            if not item_type or item_end > ilst_end:
+        while current_pos < buf_end:
+            item_type, item_payload, item_end = _read_box_header_from_buffer(
+                buf, current_pos, buf_end
+            )
+            if not item_type or item_end > buf_end:
                 break
 
-            key_name = key_map.get(
-                item_type, item_type.decode("ascii", errors="replace").strip()
-            )
+            key_name = _ILST_KEY_MAP.get(item_type)
+            if key_name is None:
+                key_name = item_type.decode("ascii", errors="replace").strip()
 
-            item_child_pos = item_start + 8
+            item_child_pos = item_payload
             while item_child_pos < item_end:
-                f.seek(item_child_pos)
-                data_type, _, data_start, data_end = _read_box_header(f)
+                data_type, data_payload, data_end = _read_box_header_from_buffer(
+                    buf, item_child_pos, buf_end
+                )
                 if not data_type or data_end > item_end:
                     break
 
                 if data_type == b"data":
-                    data_pos_before_read = f.tell()
-                    value_format_indicator = _read_uint32(f)
-                    f.read(4)
-
-                    data_length = data_end - f.tell()
-                    raw_data = f.read(data_length)
-
                     if item_type == b"covr":
-                        if value_format_indicator in _COVER_ART_FORMAT_MAP:
-                            has_cover_art = True
-                            parsed_data["cover_art_mime"] = (
-                                _COVER_ART_FORMAT_MAP.get(
-                                    value_format_indicator
+                        value_format_indicator = (
+                            _U32.unpack_from(buf, data_payload)[0]
+                            if data_payload + 4 <= len(buf)
+                            else None
+                        )
+                        has_cover_art = True
+                        mime = _COVER_ART_FORMAT_MAP.get(value_format_indicator)
+                        if mime is not None:
+                            parsed_data["cover_art_mime"] = mime
+                            # Scan the artwork inside buf rather than copying it out.
+                            dimensions = (
+                                MP4BoxParser._get_image_dimensions(
+                                    buf,
+                                    mime,
+                                    data_payload + 8,
+                                    data_end,
                                 )
-                            )
-                            dimensions = MP4BoxParser._get_image_dimensions(
-                                raw_data, parsed_data["cover_art_mime"]
+                                if include_cover_dimensions
+                                else None
                             )
                             if dimensions:
                                 parsed_data["cover_art_dimensions"] = (
                                     f"{dimensions[0]}x{dimensions[1]}"
                                 )
                         else:
-                            has_cover_art = True
                             parsed_data["cover_art_mime"] = "application/octet-stream"
-                        f.seek(data_end)
                         break
 
-                    f.seek(data_pos_before_read)
-                    parsed_value = MP4BoxParser.parse_itunes_data(
-                        f, data_end, item_type
+                    parsed_value = MP4BoxParser._decode_itunes_data(
+                        buf[data_payload:data_end], item_type
                     )
 
                     if parsed_value is not None:
-                        if isinstance(
-                                parsed_value, str
-                        ) and parsed_value.strip().startswith("<?xml"):
+                        # String values come back already stripped from _decode_itunes_data.
+                        if isinstance(parsed_value, str) and parsed_value.startswith(
+                            "<?xml"
+                        ):
                             try:
                                 plist_data = plistlib.loads(
                                     parsed_value.encode("utf-8")
@@ -1001,152 +1285,26 @@ class MP4BoxParser:
                                     f"Failed to parse XML plist data for '{key_name}': {e}"
                                 )
                                 parsed_data[key_name] = parsed_value
-                        elif (
-                                key_name in ("track_number", "disc_number")
-                                and isinstance(parsed_value, str)
-                                and "/" in parsed_value
-                        ):
-                            try:
-                                num, total = map(int, parsed_value.split("/", 1))
-                                parsed_data[key_name] = num
-                                parsed_data[key_name.replace("_number", "_total")] = (
-                                    str(total)
-                                )
-                            except (ValueError, TypeError):
-                                parsed_data[key_name] = parsed_value
-                        elif key_name == "hd_video" and isinstance(parsed_value, int):
-                            parsed_data[key_name] = bool(parsed_value)
-                            hd_map = {3: "2160p UHD", 2: "1080p HD", 1: "720p HD"}
-                            parsed_data["hd_video_definition"] = hd_map.get(
-                                parsed_value, "SD"
-                            )
-                            parsed_data["hd_video_definition_level"] = parsed_value
-                        elif key_name == "content_rating" and isinstance(
-                                parsed_value, str
-                        ):
-                            parts = parsed_value.split("|")
-                            if len(parts) >= 3:
-                                system = parts[0] if parts[0] else None
-                                label = parts[1] if parts[1] else None
-                                parsed_data["rating_system"] = system
-                                parsed_data["rating_label"] = label
-                                if system and label:
-                                    parsed_data["rating_age_classification"] = (
-                                        get_age_classification(system, label)
-                                    )
-
-                                try:
-                                    rating_unit = int(parts[2])
-                                    parsed_data["rating_unit"] = rating_unit
-                                    flag_map = {
-                                        400: "1080p HD",
-                                        300: "720p HD",
-                                        200: "SD",
-                                    }
-                                    if rating_unit in flag_map:
-                                        parsed_data["hd_video_definition"] = flag_map[
-                                            rating_unit
-                                        ]
-                                        # Map rating_unit to hdvd-style levels for consistency
-                                        level_map = {400: 2, 300: 1, 200: 0}
-                                        parsed_data["hd_video_definition_level"] = (
-                                            level_map.get(rating_unit)
-                                        )
-                                except (ValueError, IndexError):
-                                    parsed_data["rating_unit"] = None
-                            else:
+                        else:
+                            store = _ILST_VALUE_HANDLERS.get(key_name)
+                            if store is None:
                                 parsed_data[key_name] = parsed_value
-                        elif key_name == "itunesadvisory" and isinstance(
-                                parsed_value, int
-                        ):
-                            if parsed_value in (0, 2):
-                                parsed_data[key_name] = "0"
-                            elif parsed_value in (1, 4):
-                                parsed_data[key_name] = "1"
                             else:
-                                parsed_data[key_name] = str(parsed_value)
-                        elif key_name in (
-                                "compilation",
-                                "gapless_playback",
-                                "podcast",
-                        ) and isinstance(parsed_value, int):
-                            parsed_data[key_name] = bool(parsed_value)
-                        else:
-                            parsed_data[key_name] = parsed_value
+                                store(key_name, parsed_value, parsed_data)
                     break
                 item_child_pos = data_end
             current_pos = item_end
+            if wanted_keys is not None and all(
+                parsed_data.get(key, _UNSET) is not _UNSET for key in wanted_keys
+            ):
+                break
 
         if has_cover_art:
             parsed_data["has_cover_art"] = True
 
-        metadata = {}
-        output_order = [
-            "title",
-            "artist",
-            "album",
-            "album_artist",
-            "track_number",
-            "track_total",
-            "disc_number",
-            "disc_total",
-            "genre",
-            "release_date",
-            "duration_seconds",
-            "tempo",
-            "publisher",
-            "record_company",
-            "copyright",
-            "isrc",
-            "barcode",
-            "upc",
-            "media_type",
-            "itunesadvisory",
-            "rating_system",
-            "rating_label",
-            "rating_age_classification",
-            "rating_unit",
-            "lyrics",
-            "comment",
-            "grouping",
-            "keywords",
-            "description",
-            "long_description",
-            "series_description",
-            "has_cover_art",
-            "cover_art_mime",
-            "cover_art_dimensions",
-            "encoder",
-            "encoded_by",
-            "language",
-            "compilation",
-            "gapless_playback",
-            "podcast",
-            "category",
-            "tv_show_name",
-            "tv_episode_id",
-            "tv_season",
-            "tv_episode_number",
-            "tv_network",
-            "hd_video",
-            "hd_video_definition",
-            "hd_video_definition_level",
-            "studio",
-            "content_id",
-            "composer",
-            "performer",
-            "directors",
-            "producers",
-            "screenwriters",
-            "cast",
-            "owner",
-        ]
-
-        for key in output_order:
-            if key in parsed_data:
-                metadata[key] = parsed_data.pop(key)
-
-        metadata.update(parsed_data)
+        metadata = {
+            key: value for key, value in parsed_data.items() if value is not _UNSET
+        }
 
         if "media_type" in metadata and metadata["media_type"] == 1:
             metadata.pop("hd_video", None)
@@ -1156,12 +1314,15 @@ class MP4BoxParser:
                 metadata["itunesadvisory"] = 0
             metadata.pop("content_rating", None)
 
-        f.seek(ilst_end)
         return metadata
 
     @staticmethod
     def parse_meta(
-        f: BinaryIO, meta_end: int
+        f: BinaryIO,
+        meta_end: int,
+        include_cover_dimensions: bool = True,
+        wanted_keys: Optional[Set[str]] = None,
+        use_cache: bool = True,
     ) -> Dict[str, Union[str, int, Dict[str, Any], None]]:
         """
         Parses a 'meta' box for general file-level metadata.
@@ -1173,33 +1334,54 @@ class MP4BoxParser:
             f.seek(meta_end)
             return metadata
 
-        f.read(4)
-        current_pos = f.tell()
+        # Read the payload once; children are walked by offset past version/flags.
+        buf = f.read(meta_end - meta_start)
+        buf_end = meta_end - meta_start
+        current_pos = 4
 
         hdlr_parsed = False
-        if current_pos < meta_end:
-            f.seek(current_pos)
-            hdlr_type, hdlr_size, _, hdlr_end = _read_box_header(f)
+        if current_pos < buf_end:
+            hdlr_type, _, hdlr_end = _read_box_header_from_buffer(
+                buf, current_pos, buf_end
+            )
             if hdlr_type == b"hdlr":
-                MP4BoxParser.parse_hdlr(f, hdlr_end)
+                # Only its presence matters here; the handler fields are not used.
                 hdlr_parsed = True
                 current_pos = hdlr_end
+            elif hdlr_type:
+                current_pos = hdlr_end
             else:
-                current_pos += hdlr_size if hdlr_size > 0 else 8
+                current_pos += 8
 
         if not hdlr_parsed:
             logger.warning("No 'hdlr' box found as first child of 'meta'.")
 
-        while current_pos < meta_end:
-            f.seek(current_pos)
-            box_type, _, _, box_end = _read_box_header(f)
-            if not box_type or box_end > meta_end:
+        while current_pos < buf_end:
+            box_type, box_payload, box_end = _read_box_header_from_buffer(
+                buf, current_pos, buf_end
+            )
+            if not box_type or box_end > buf_end:
                 break
             if box_type == b"ilst":
-                ilst_metadata = MP4BoxParser.parse_ilst(f, box_end)
-                metadata.update(ilst_metadata)
+                # The item list is parsed in place from the meta buffer.
+                metadata.update(
+                    MP4BoxParser._parse_ilst_items_cached(
+                        f,
+                        buf,
+                        box_payload,
+                        box_end,
+                        meta_start,
+                        include_cover_dimensions,
+                        wanted_keys,
+                        use_cache,
+                    )
+                )
+                if metadata:
+                    # A 'meta' box holds at most one item list; skip the trailing boxes.
+                    break
             current_pos = box_end
-        f.seek(meta_end)
+        if f.tell() != meta_end:
+            f.seek(meta_end)
         return metadata
 
     @staticmethod
@@ -1208,52 +1390,43 @@ class MP4BoxParser:
     ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         name: Optional[str] = None
 
-        # Skip version (1), flags (3), and number of entries (4).
-        f.read(8)
-        if f.tell() >= stsd_end:
-            f.seek(stsd_end)
-            return None, None, None
-
-        # Now we are at the beginning of the first sample entry.
-        entry_type, _, entry_start, entry_end = _read_box_header(f)
-        if not entry_type or entry_end > stsd_end:
-            f.seek(stsd_end)
-            return None, None, None
-
-        codec_tag = entry_type.decode("ascii", errors="replace")
-        codec = codec_tag
-        codec_tag_string = _SUBTITLE_CODEC_MAP.get(codec_tag, codec_tag)
-
-        # Look for a descriptive name inside this sample entry.
-        if entry_type in (b"tx3g", b"mp4s", b"subp", b"clcp", b"text", b"c608"):
-            current_child_pos = f.tell()
-            while current_child_pos < entry_end:
-                if entry_end - current_child_pos < 8:
-                    break
-                f.seek(current_child_pos)
-                child_type, _, child_start, child_end = _read_box_header(f)
-                if not child_type or child_end > entry_end:
-                    break
+        with _AtBoxEnd(f, stsd_end):
+            # Skip version (1), flags (3), and number of entries (4).
+            f.read(8)
+            if f.tell() >= stsd_end:
+                return None, None, None
 
-                if child_type in (
-                        b"\xa9nam",
-                        b"name",
-                        b"titl",
-                        b"desc",
-                        b"drmi",
-                        b"text",
-                        b"kind",
-                        b"uri ",
-                ):
-                    f.seek(child_start + 8)
-                    potential_name = MP4BoxParser.parse_qtss(f, child_end)
-                    if potential_name:
-                        name = potential_name
+            # Now we are at the beginning of the first sample entry.
+            entry_type, _, entry_start, entry_end = _read_box_header(f)
+            if not entry_type or entry_end > stsd_end:
+                return None, None, None
+
+            known = _SUBTITLE_CODEC_BY_ENTRY_TYPE.get(entry_type)
+            if known is None:
+                codec = codec_tag_string = entry_type.decode("ascii", errors="replace")
+            else:
+                codec, codec_tag_string = known
+
+            # Look for a descriptive name inside this sample entry.
+            if entry_type in _SUBTITLE_ENTRY_TYPES:
+                current_child_pos = f.tell()
+                while current_child_pos < entry_end:
+                    if entry_end - current_child_pos < 8:
+                        break
+                    f.seek(current_child_pos)
+                    child_type, _, child_start, child_end = _read_box_header(f)
+                    if not child_type or child_end > entry_end:
                         break
-                current_child_pos = child_end
 
-        f.seek(stsd_end)
-        return codec, codec_tag_string, name
+                    if child_type in _SUBTITLE_NAME_CHILD_TYPES:
+                        f.seek(child_start + 8)
+                        potential_name = MP4BoxParser.parse_qtss(f, child_end)
+                        if potential_name:
+                            name = potential_name
+                            break
+                    current_child_pos = child_end
+
+            return codec, codec_tag_string, name
 
     @staticmethod
     def parse_stsd_audio(f: BinaryIO, stsd_end: int) -> Dict[str, Any]:
@@ -1265,104 +1438,146 @@ class MP4BoxParser:
             "sample_rate": 0,
         }
         channel_layout = None
-        f.seek(8, 1)
-        if f.tell() >= stsd_end:
-            return audio_details
 
-        entry_type, _, entry_start, entry_end = _read_box_header(f)
-        if not entry_type:
-            return audio_details
+        with _AtBoxEnd(f, stsd_end):
+            f.seek(8, 1)
+            if f.tell() >= stsd_end:
+                return audio_details
 
-        codec_tag = entry_type.decode("ascii", errors="replace")
-        audio_details["codec_tag_string"] = codec_tag
-        audio_details["codec"] = _AUDIO_CODEC_MAP.get(codec_tag, codec_tag)
-
-        f.seek(entry_start + 8)
-        f.read(16)
-        audio_details["channels"] = _read_uint16(f)
-        audio_details["bits_per_sample"] = _read_uint16(f)
-        f.read(4)
-        sr = _read_uint32(f)
-        if sr:
-            audio_details["sample_rate"] = sr >> 16
-
-        current_pos = f.tell()
-        while current_pos < entry_end:
-            f.seek(current_pos)
-            child_type, _, child_start, child_end = _read_box_header(f)
-            if not child_type or child_end > entry_end:
-                break
+            entry_type, _, entry_start, entry_end = _read_box_header(f)
+            if not entry_type:
+                return audio_details
 
-            if child_type == b"esds":
-                f.seek(child_start + 8 + 4)
-                if _read_uint8(f) == 0x03:
-                    MP4BoxParser._read_mp4_descriptor_length(f)
-                    f.read(3)
-                    if _read_uint8(f) == 0x04:
+            known = _AUDIO_CODEC_BY_ENTRY_TYPE.get(entry_type)
+            if known is None:
+                codec_tag = codec = entry_type.decode("ascii", errors="replace")
+            else:
+                codec_tag, codec = known
+            audio_details["codec_tag_string"] = codec_tag
+            audio_details["codec"] = codec
+
+            f.seek(entry_start + 8)
+            # Reserved/version fields, channelcount, samplesize, pre_defined/reserved, samplerate.
+            sample_entry = f.read(28)
+            if len(sample_entry) == 28:
+                channels, bits_per_sample, sr = _AUDIO_SAMPLE_ENTRY.unpack(sample_entry)
+            else:
+                channels = (
+                    _U16.unpack_from(sample_entry, 16)[0]
+                    if len(sample_entry) >= 18
+                    else None
+                )
+                bits_per_sample = (
+                    _U16.unpack_from(sample_entry, 18)[0]
+                    if len(sample_entry) >= 20
+                    else None
+                )
+                sr = None
+            audio_details["channels"] = channels
+            audio_details["bits_per_sample"] = bits_per_sample
+            if sr:
+                audio_details["sample_rate"] = sr >> 16
+
+            current_pos = f.tell()
+            while current_pos < entry_end:
+                f.seek(current_pos)
+                child_type, _, child_start, child_end = _read_box_header(f)
+                if not child_type or child_end > entry_end:
+                    break
+
+                if child_type == b"esds":
+                    f.seek(child_start + 8 + 4)
+                    if _read_uint8(f) == 0x03:
                         MP4BoxParser._read_mp4_descriptor_length(f)
-                        f.read(13)
-                        if _read_uint8(f) == 0x05:
-                            if MP4BoxParser._read_mp4_descriptor_length(f) >= 2:
-                                asc_data = f.read(2)
-                                reader = BitReader(asc_data)
-                                reader.read_bits(9)
-                                channel_config = reader.read_bits(4)
-                                channel_map = {
-                                    1: (1, "1.0"), 2: (2, "2.0"), 3: (3, "3.0"),
-                                    4: (4, "4.0"), 5: (5, "5.0"), 6: (6, "5.1"),
-                                    7: (8, "7.1"),
-                                }
-                                if channel_config in channel_map:
-                                    count, layout = channel_map[channel_config]
-                                    audio_details["channels"] = count
-                                    channel_layout = layout
-                break
+                        f.read(3)
+                        if _read_uint8(f) == 0x04:
+                            MP4BoxParser._read_mp4_descriptor_length(f)
+                            f.read(13)
+                            if _read_uint8(f) == 0x05:
+                                if MP4BoxParser._read_mp4_descriptor_length(f) >= 2:
+                                    asc_data = f.read(2)
+                                    # audioObjectType (5 bits), samplingFrequencyIndex (4),
+                                    # then channelConfiguration (4).
+                                    channel_config = (
+                                        ((asc_data[0] << 8 | asc_data[1]) >> 3) & 0x0F
+                                        if len(asc_data) == 2
+                                        else None
+                                    )
+                                    if channel_config in _AAC_CHANNEL_CONFIG_MAP:
+                                        count, layout = _AAC_CHANNEL_CONFIG_MAP[
+                                            channel_config
+                                        ]
+                                        audio_details["channels"] = count
+                                        channel_layout = layout
+                    break
 
-            elif child_type == b"dac3":
-                f.read(1)
-                bits = _read_uint8(f)
-                if bits is not None:
-                    acmod = (bits >> 3) & 0x07
-                    lfeon = (bits >> 2) & 0x01
-                    main_channels = {0: 2, 1: 1, 2: 2, 3: 3, 4: 3, 5: 4, 6: 4, 7: 5}.get(acmod, 0)
-                    audio_details["channels"] = main_channels + lfeon
-                    channel_layout = "1+1" if acmod == 0 else f"{main_channels}.{lfeon}"
-                break
+                elif child_type == b"dac3":
+                    # acmod and lfeon sit in the second byte, after fscod/bsid/bsmod.
+                    dac3 = f.read(2)
+                    if len(dac3) == 2:
+                        # Bits 5-3 are acmod and bit 2 is lfeon.
+                        audio_details["channels"], channel_layout = (
+                            _AC3_CHANNEL_LAYOUTS[(dac3[1] >> 2) & 0x0F]
+                        )
+                    break
 
-            elif child_type == b"dec3":
-                payload_start_pos = f.tell()
-                payload = f.read(child_end - payload_start_pos)
-
-                # Initialize dolby_atmos field for all E-AC-3 tracks.
-                audio_details["dolby_atmos"] = False
-                # If payload is > 5 bytes, it contains JOC data, so we set it to True.
-                if len(payload) > 5:
-                    audio_details["dolby_atmos"] = True
-
-                f.seek(payload_start_pos)
-
-                if audio_details.get("channels") == 8:
-                    channel_layout = "7.1"
-
-                f.read(2)
-                if child_end - f.tell() >= 3:
-                    f.seek(1, 1)
-                    bits = _read_uint8(f)
-                    if bits is not None:
-                        acmod = (bits >> 1) & 0x07
-                        lfeon = bits & 0x01
-                        main_channels = {0: 2, 1: 1, 2: 2, 3: 3, 4: 3, 5: 4, 6: 4, 7: 5}.get(acmod, 0)
-                        audio_details["channels"] = main_channels + lfeon
-                        channel_layout = "1+1" if acmod == 0 else f"{main_channels}.{lfeon}"
-                break
+                elif child_type == b"dec3":
+                    payload_start_pos = f.tell()
+                    payload = f.read(child_end - payload_start_pos)
+
+                    # If payload is > 5 bytes, it contains JOC data (Dolby Atmos).
+                    audio_details["dolby_atmos"] = len(payload) > 5
+
+                    if audio_details.get("channels") == 8:
+                        channel_layout = "7.1"
+
+                    # data_rate/num_ind_sub take two bytes; acmod and lfeon are in the fourth.
+                    if child_end - payload_start_pos >= 5 and len(payload) >= 4:
+                        # Bits 3-1 are acmod and bit 0 is lfeon.
+                        audio_details["channels"], channel_layout = (
+                            _AC3_CHANNEL_LAYOUTS[payload[3] & 0x0F]
+                        )
+                    break
+
+                current_pos = child_end
 
-            current_pos = child_end
+            if channel_layout:
+                audio_details["channel_layout"] = channel_layout
 
-        if channel_layout:
-            audio_details["channel_layout"] = channel_layout
+            return audio_details
+
+    @staticmethod
+    def _finalize_hdr_format(
+        video_details: Dict[str, Any], codec_tag: str, has_mdcv: bool
+    ) -> str:
+        """
+        Applies the Dolby Vision colour defaults, then classifies the stream with a
+        single _HDR_FORMAT_MAP lookup and stores the result in 'hdr_format'.
+        """
+        dolby_vision = video_details["dolby_vision"]
+        if dolby_vision:
+            for key, default in _DOLBY_VISION_COLOR_DEFAULTS:
+                if video_details[key] is None:
+                    video_details[key] = default
+            if (
+                video_details.get("dolby_vision_profile"),
+                codec_tag,
+            ) in _DV_SDR_COMPATIBLE:
+                video_details["dolby_vision_sdr_compatible"] = True
+        hdr_format = _HDR_FORMAT_MAP.get(
+            (video_details["transfer_characteristics"], dolby_vision, has_mdcv),
+            "Dolby Vision" if dolby_vision else "SDR",
+        )
+        video_details["hdr_format"] = hdr_format
+        return hdr_format
 
-        f.seek(stsd_end)
-        return audio_details
+    @staticmethod
+    def _fill_unknown_colors(details: Dict[str, Any]) -> Dict[str, Any]:
+        """Reports colour fields that were never signalled as "Unknown"."""
+        for key in _COLOR_FIELD_KEYS:
+            if details[key] is None:
+                details[key] = "Unknown"
+        return details
 
     @staticmethod
     def parse_stsd_video(
@@ -1383,178 +1598,181 @@ class MP4BoxParser:
             "profile": None,
             "chroma_location": None,
             "hdr_format": "SDR",
-            "color_primaries": "Unknown",
-            "transfer_characteristics": "Unknown",
-            "matrix_coefficients": "Unknown",
-            "color_space": "Unknown",
-            "color_transfer": "Unknown",
-            "color_range": "Unknown",
+            # Colour fields use None while parsing and are reported as "Unknown".
+            "color_primaries": None,
+            "transfer_characteristics": None,
+            "matrix_coefficients": None,
+            "color_space": None,
+            "color_transfer": None,
+            "color_range": None,
             "dolby_vision_profile": None,
             "dolby_vision_level": None,
             "dolby_vision": False,
             "dolby_vision_sdr_compatible": False,
         }
 
-        f.seek(8, 1)
-        if f.tell() >= stsd_end:
-            return video_details
+        with _AtBoxEnd(f, stsd_end):
+            f.seek(8, 1)
+            if f.tell() >= stsd_end:
+                return MP4BoxParser._fill_unknown_colors(video_details)
 
-        entry_type, _, entry_start, entry_end = _read_box_header(f)
-        if not entry_type:
-            return video_details
+            entry_type, _, entry_start, entry_end = _read_box_header(f)
+            if not entry_type:
+                return MP4BoxParser._fill_unknown_colors(video_details)
 
-        codec_tag = entry_type.decode("ascii", "replace")
-        video_details.update(
-            {
-                "codec_tag_string": codec_tag,
-                "codec": _VIDEO_CODEC_MAP.get(codec_tag, codec_tag),
+            known = _VIDEO_CODEC_BY_ENTRY_TYPE.get(entry_type)
+            if known is None:
+                codec_tag = codec = entry_type.decode("ascii", "replace")
+            else:
+                codec_tag, codec = known
+            video_details["codec_tag_string"] = codec_tag
+            video_details["codec"] = codec
+
+            # Width and height follow the box header and 24 bytes of reserved/predefined fields.
+            f.seek(entry_start + 8 + 24)
+            dims = f.read(4)
+            if len(dims) == 4:
+                width, height = _VISUAL_SAMPLE_DIMS.unpack(dims)
+            else:
+                width = _U16.unpack_from(dims)[0] if len(dims) >= 2 else None
+                height = None
+            if width:
+                video_details["width"] = width
+            if height:
+                video_details["height"] = height
+
+            has_mdcv, container_colr_found = False, False
+            vpc_data: Dict[str, int] = {}
+
+            # A map of box types to their respective parser functions
+            codec_config_parsers = {
+                b"avcC": MP4BoxParser._parse_avcC,
+                b"hvcC": MP4BoxParser._parse_hvcC,
+                b"av1C": MP4BoxParser._parse_av1C,
             }
-        )
-
-        f.seek(entry_start + 8 + 24)
-        width, height = _read_uint16(f), _read_uint16(f)
-        if width:
-            video_details["width"] = width
-        if height:
-            video_details["height"] = height
-
-        current_pos = entry_start + 8 + 78
-        has_mdcv, container_colr_found = False, False
-        vpc_data: Dict[str, int] = {}
-
-        # A map of box types to their respective parser functions
-        codec_config_parsers = {
-            b"avcC": MP4BoxParser._parse_avcC,
-            b"hvcC": MP4BoxParser._parse_hvcC,
-            b"av1C": MP4BoxParser._parse_av1C,
-        }
 
-        while current_pos < entry_end:
-            f.seek(current_pos)
-            child_type, _, child_start, child_end = _read_box_header(f)
-            if not child_type or child_end > entry_end:
-                break
+            # Read the child boxes after the 78-byte visual sample entry fields in one go.
+            children_start = entry_start + 8 + 78
+            f.seek(children_start)
+            body = f.read(max(entry_end - children_start, 0))
+            body_end = entry_end - children_start
+            current_pos = 0
 
-            if child_type in (b"dvcC", b"dvvC"):
-                video_details["dolby_vision"] = True
-                f.seek(child_start + 10)
-                if (val := _read_uint16(f)) is not None:
-                    video_details["dolby_vision_profile"] = (val >> 9) & 0x7F
-                    video_details["dolby_vision_level"] = (val >> 3) & 0x3F
-            elif child_type in codec_config_parsers:
-                codec_details = codec_config_parsers[child_type](f, child_end)
-                if codec_details:
-                    video_details.update(
-                        {k: v for k, v in codec_details.items() if v is not None}
-                    )
-            elif child_type == b"vpcC":
-                vpc_data = MP4BoxParser._parse_vpc_config(f, child_end)
-                if vpc_data:
-                    video_details.update(vpc_data)
-            elif child_type == b"colr":
-                container_colr_found = True
-                f.seek(child_start + 8)
-                param_type = f.read(4)
-                p, t, m = _read_uint16(f), _read_uint16(f), _read_uint16(f)
-                video_details["color_primaries"] = COLOR_PRIMARIES_MAP.get(p, str(p))
-                video_details["transfer_characteristics"] = (
-                    TRANSFER_CHARACTERISTICS_MAP.get(t, str(t))
-                )
-                video_details["matrix_coefficients"] = MATRIX_COEFFICIENTS_MAP.get(
-                    m, str(m)
+            while current_pos < body_end:
+                child_type, child_payload, child_end = _read_box_header_from_buffer(
+                    body, current_pos, body_end
                 )
-                if param_type == b"nclx" and (rb := _read_uint8(f)) is not None:
-                    video_details["color_range"] = "full" if (rb >> 7) & 1 else "tv"
-            elif child_type == b"mdcv":
-                has_mdcv = True
-
-            current_pos = child_end
+                if not child_type or child_end > body_end:
+                    break
 
-        # Finalize VP9 pixel format using all gathered info
-        if codec_tag == "vp09" and vpc_data:
-            bit_depth = vpc_data.get("bit_depth")
-            chroma = vpc_data.get("chroma_subsampling")
-            if (
-                video_details.get("transfer_characteristics")
-                in ("smpte2084", "arib-std-b67")
-                and bit_depth is not None
-                and bit_depth < 10
-            ):
-                bit_depth = 10  # Correct bit_depth based on more reliable HDR signal from 'colr' box
-            if chroma is not None and bit_depth is not None:
-                pix_fmt_base = {0: "yuv420p", 1: "yuv422p", 2: "yuv444p"}.get(chroma)
-                if pix_fmt_base:
-                    video_details["pixel_format"] = (
-                        f"{pix_fmt_base}{bit_depth}le"
-                        if bit_depth > 8
-                        else pix_fmt_base
+                if child_type in _DOLBY_VISION_CONFIG_TYPES:
+                    video_details["dolby_vision"] = True
+                    # Profile and level follow the two version bytes.
+                    if child_payload + 4 <= len(body):
+                        val = _U16.unpack_from(body, child_payload + 2)[0]
+                        video_details["dolby_vision_profile"] = (val >> 9) & 0x7F
+                        video_details["dolby_vision_level"] = (val >> 3) & 0x3F
+                elif child_type in codec_config_parsers:
+                    codec_details = codec_config_parsers[child_type](
+                        body, child_payload, child_end
                     )
-
-        # Use vpcC as a fallback for color info if 'colr' box was missing
-        if not container_colr_found and vpc_data:
-            if (p := vpc_data.get("colour_primaries")) is not None:
-                video_details["color_primaries"] = COLOR_PRIMARIES_MAP.get(p, str(p))
-            if (t := vpc_data.get("transfer_characteristics")) is not None:
-                video_details["transfer_characteristics"] = (
-                    TRANSFER_CHARACTERISTICS_MAP.get(t, str(t))
-                )
-            if (m := vpc_data.get("matrix_coefficients")) is not None:
-                video_details["matrix_coefficients"] = MATRIX_COEFFICIENTS_MAP.get(
-                    m, str(m)
-                )
-
-        # Determine HDR Format
-        if video_details["dolby_vision"]:
-            if video_details["color_primaries"] == "Unknown":
-                video_details["color_primaries"] = "bt2020"
-            if video_details["transfer_characteristics"] == "Unknown":
-                video_details["transfer_characteristics"] = "smpte2084"
-            if video_details["matrix_coefficients"] == "Unknown":
-                video_details["matrix_coefficients"] = "bt2020nc"
-            is_hdr10_base = (
-                video_details["transfer_characteristics"] == "smpte2084" and has_mdcv
-            )
-            video_details["hdr_format"] = (
-                "HDR10, Dolby Vision" if is_hdr10_base else "Dolby Vision"
+                    if codec_details:
+                        video_details.update(
+                            {k: v for k, v in codec_details.items() if v is not None}
+                        )
+                elif child_type == b"vpcC":
+                    vpc_data = MP4BoxParser._parse_vpc_config(
+                        body, child_payload, child_end
+                    )
+                    if vpc_data:
+                        # vpcC colour fields are only a fallback: a 'colr' box wins
+                        # whether it comes before or after this one.
+                        p = vpc_data.pop("color_primaries", None)
+                        t = vpc_data.pop("transfer_characteristics", None)
+                        m = vpc_data.pop("matrix_coefficients", None)
+                        video_details.update(vpc_data)
+                        if not container_colr_found:
+                            if p is not None:
+                                video_details["color_primaries"] = (
+                                    COLOR_PRIMARIES_MAP.get(p, str(p))
+                                )
+                            if t is not None:
+                                video_details["transfer_characteristics"] = (
+                                    TRANSFER_CHARACTERISTICS_MAP.get(t, str(t))
+                                )
+                            if m is not None:
+                                video_details["matrix_coefficients"] = (
+                                    MATRIX_COEFFICIENTS_MAP.get(m, str(m))
+                                )
+                elif child_type == b"colr":
+                    container_colr_found = True
+                    param_type = body[child_payload : child_payload + 4]
+                    p, t, m = (
+                        _U16.unpack_from(body, pos)[0] if pos + 2 <= len(body) else None
+                        for pos in range(child_payload + 4, child_payload + 10, 2)
+                    )
+                    video_details["color_primaries"] = COLOR_PRIMARIES_MAP.get(
+                        p, str(p)
+                    )
+                    video_details["transfer_characteristics"] = (
+                        TRANSFER_CHARACTERISTICS_MAP.get(t, str(t))
+                    )
+                    video_details["matrix_coefficients"] = MATRIX_COEFFICIENTS_MAP.get(
+                        m, str(m)
+                    )
+                    if param_type == b"nclx" and child_payload + 10 < len(body):
+                        rb = body[child_payload + 10]
+                        video_details["color_range"] = "full" if (rb >> 7) & 1 else "tv"
+                elif child_type == b"mdcv":
+                    has_mdcv = True
+
+                current_pos = child_end
+
+            # Finalize VP9 pixel format using all gathered info
+            if codec_tag == "vp09" and vpc_data:
+                bit_depth = vpc_data.get("bit_depth")
+                chroma = vpc_data.get("chroma_subsampling")
+                if (
+                    container_colr_found
+                    and video_details.get("transfer_characteristics") in _HDR_TRANSFERS
+                    and bit_depth is not None
+                    and bit_depth < 10
+                ):
+                    bit_depth = 10  # Correct bit_depth based on more reliable HDR signal from 'colr' box
+                if chroma is not None and bit_depth is not None:
+                    pixel_format = _VP9_PIX_FMT_BY_CHROMA_DEPTH.get((chroma, bit_depth))
+                    if pixel_format:
+                        video_details["pixel_format"] = pixel_format
+
+            # Determine HDR Format
+            hdr_format = MP4BoxParser._finalize_hdr_format(
+                video_details, codec_tag, has_mdcv
             )
-            if video_details.get("dolby_vision_profile") in {8, 10} and codec_tag in {
-                "hvc1",
-                "av01",
-            }:
-                video_details["dolby_vision_sdr_compatible"] = True
-        elif video_details["transfer_characteristics"] == "arib-std-b67":
-            video_details["hdr_format"] = "HLG"
-        elif video_details["transfer_characteristics"] == "smpte2084":
-            video_details["hdr_format"] = "HDR10" if has_mdcv else "HDR (PQ)"
-
-        # Populate derived fields
-        if video_details.get("matrix_coefficients") != "Unknown":
-            video_details["color_space"] = video_details["matrix_coefficients"]
-        if video_details.get("transfer_characteristics") != "Unknown":
-            video_details["color_transfer"] = video_details["transfer_characteristics"]
-        if video_details.get("color_range") == "Unknown":
-            video_details["color_range"] = "tv"
-
-        # If the codec is VP9, remove fields used for intermediate calculations.
-        if video_details.get("codec") == "vp9":
-            video_details.pop("bit_depth", None)
-            video_details.pop("chroma_subsampling", None)
-
-        if not video_details.get("dolby_vision"):
-            for key in [
-                "dolby_vision",
-                "dolby_vision_profile",
-                "dolby_vision_level",
-                "dolby_vision_sdr_compatible",
-            ]:
-                video_details.pop(key, None)
-        if video_details.get("hdr_format") == "SDR":
-            for key in [
-                "color_primaries",
-                "matrix_coefficients",
-                "transfer_characteristics",
-            ]:
-                video_details.pop(key, None)
+            dolby_vision = video_details["dolby_vision"]
+            transfer = video_details["transfer_characteristics"]
+            matrix = video_details["matrix_coefficients"]
+
+            # Populate derived fields
+            if matrix is not None:
+                video_details["color_space"] = matrix
+            if transfer is not None:
+                video_details["color_transfer"] = transfer
+            if video_details["color_range"] is None:
+                video_details["color_range"] = "tv"
+            MP4BoxParser._fill_unknown_colors(video_details)
+
+            # Drop VP9 intermediates, absent Dolby Vision fields and SDR colour
+            # fields in one rebuild rather than a pop per key.
+            drop = frozenset()
+            if video_details.get("codec") == "vp9":
+                drop |= _VP9_INTERMEDIATE_KEYS
+            if not dolby_vision:
+                drop |= _DOLBY_VISION_KEYS
+            if hdr_format == "SDR":
+                drop |= _SDR_COLOR_KEYS
+            if drop:
+                video_details = {
+                    k: v for k, v in video_details.items() if k not in drop
+                }
 
-        f.seek(stsd_end)
-        return video_details
+            return video_details
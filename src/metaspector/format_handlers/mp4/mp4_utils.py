@@ -8,6 +8,13 @@ from typing import BinaryIO, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+_U8 = struct.Struct(">B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+_BOX_HEADER = struct.Struct(">I4s")
+_BOX_SIZE_64 = _U64
+
 _COVER_ART_FORMAT_MAP = {
     13: "image/jpeg",
     14: "image/png"
@@ -58,6 +65,83 @@ _AV1_CHROMA_LOCATION_MAP = {
     2: "left",
 }
 
+_PIX_FMT_BY_CHROMA = {0: "gray", 1: "yuv420p", 2: "yuv422p", 3: "yuv444p"}
+
+_AV1_PIX_FMT_BY_SUBSAMPLING = {(1, 1): "yuv420p", (1, 0): "yuv422p", (0, 0): "yuv444p"}
+
+_VP9_PIX_FMT_BY_CHROMA = {0: "yuv420p", 1: "yuv422p", 2: "yuv444p"}
+
+# Pre-formatted names for the common high bit depth formats.
+_PIX_FMT_DEEP = {
+    (base, bit_depth): f"{base}{bit_depth}le"
+    for base in ("gray", "yuv420p", "yuv422p", "yuv444p")
+    for bit_depth in (10, 12)
+}
+
+# (chroma_format_idc, bit_depth) -> pixel format for the AVC/HEVC SPS depth range.
+_PIX_FMT_BY_CHROMA_DEPTH = {
+    (chroma, bit_depth): f"{base}{bit_depth}le" if bit_depth > 8 else base
+    for chroma, base in _PIX_FMT_BY_CHROMA.items()
+    for bit_depth in range(8, 17)
+}
+
+# (chroma_subsampling, bit_depth) -> pixel format for every 4-bit vpcC bit depth.
+_VP9_PIX_FMT_BY_CHROMA_DEPTH = {
+    (chroma, bit_depth): f"{base}{bit_depth}le" if bit_depth > 8 else base
+    for chroma, base in _VP9_PIX_FMT_BY_CHROMA.items()
+    for bit_depth in range(16)
+}
+
+
+def _av1_pix_fmt(fields: int) -> Optional[str]:
+    """
+    Maps av1C flag bits 6..2 (high_bitdepth, twelve_bit, mono_chrome,
+    chroma_subsampling_x, chroma_subsampling_y) to a pixel format name.
+    """
+    bit_depth = 8
+    if fields & 0x10:
+        bit_depth = 12 if fields & 0x08 else 10
+    if fields & 0x04:
+        base = "gray"
+    else:
+        base = _AV1_PIX_FMT_BY_SUBSAMPLING.get(((fields >> 1) & 1, fields & 1))
+    if base and bit_depth > 8:
+        return _PIX_FMT_DEEP.get((base, bit_depth))
+    return base
+
+
+# Indexed by (av1C flags >> 2) & 0x1F.
+_AV1_PIX_FMT_TABLE = tuple(_av1_pix_fmt(fields) for fields in range(32))
+
+# (transfer_characteristics, dolby_vision, has_mdcv) -> hdr_format. Combinations
+# not listed are "Dolby Vision" when a dvcC/dvvC box is present and "SDR" otherwise.
+_HDR_FORMAT_MAP = {
+    ("smpte2084", False, False): "HDR (PQ)",
+    ("smpte2084", False, True): "HDR10",
+    ("arib-std-b67", False, False): "HLG",
+    ("arib-std-b67", False, True): "HLG",
+    ("smpte2084", True, False): "Dolby Vision",
+    ("smpte2084", True, True): "HDR10, Dolby Vision",
+    # Profile 8.4 carries an HLG-compatible base layer.
+    ("arib-std-b67", True, False): "HLG, Dolby Vision",
+    ("arib-std-b67", True, True): "HLG, Dolby Vision",
+}
+
+# Colour fields assumed for Dolby Vision streams that do not signal them.
+_DOLBY_VISION_COLOR_DEFAULTS = (
+    ("color_primaries", "bt2020"),
+    ("transfer_characteristics", "smpte2084"),
+    ("matrix_coefficients", "bt2020nc"),
+)
+
+# Transfer characteristics that signal HDR on their own.
+_HDR_TRANSFERS = frozenset(("smpte2084", "arib-std-b67"))
+
+# (dolby_vision_profile, codec_tag) pairs whose base layer is SDR-compatible.
+_DV_SDR_COMPATIBLE = frozenset(
+    (profile, tag) for profile in (8, 10) for tag in ("hvc1", "av01")
+)
+
 _VIDEO_CODEC_MAP = {
     "avc1": "h264",
     "avc3": "h264",
@@ -148,19 +232,145 @@ _SUBTITLE_CODEC_MAP = {
     "wvtt": "webvtt",
 }
 
+# Raw sample entry type -> (codec tag string, mapped name), so known tags skip the decode.
+_VIDEO_CODEC_BY_ENTRY_TYPE = {
+    tag.encode("ascii"): (tag, codec) for tag, codec in _VIDEO_CODEC_MAP.items()
+}
+_AUDIO_CODEC_BY_ENTRY_TYPE = {
+    tag.encode("ascii"): (tag, codec) for tag, codec in _AUDIO_CODEC_MAP.items()
+}
+_SUBTITLE_CODEC_BY_ENTRY_TYPE = {
+    tag.encode("ascii"): (tag, codec) for tag, codec in _SUBTITLE_CODEC_MAP.items()
+}
+
+_ILST_KEY_MAP = {
+    b"\xa9nam": "title",
+    b"\xa9ART": "artist",
+    b"\xa9alb": "album",
+    b"\xa9cmt": "comment",
+    b"\xa9day": "release_date",
+    b"\xa9gen": "genre",
+    b"\xa9too": "encoder",
+    b"\xa9wrt": "composer",
+    b"trkn": "track_number",
+    b"disk": "disc_number",
+    b"gnre": "genre_id",
+    b"covr": "cover_art",
+    b"rtng": "itunesadvisory",
+    b"cpil": "compilation",
+    b"pgap": "gapless_playback",
+    b"shwm": "show_name",
+    b"eply": "episode_id",
+    b"tvsn": "tv_season",
+    b"tves": "tv_episode_number",
+    b"tven": "tv_episode_id",
+    b"desc": "description",
+    b"ldes": "long_description",
+    b"sdes": "series_description",
+    b"pcst": "podcast",
+    b"purl": "podcast_url",
+    b"egid": "episode_guid",
+    b"keyw": "keywords",
+    b"catg": "category",
+    b"hdvd": "hd_video",
+    b"stik": "media_type",
+    b"purd": "purchase_date",
+    b"cprt": "copyright",
+    b"akID": "apple_store_id",
+    b"cnID": "content_id",
+    b"geid": "genre_id_2",
+    b"plID": "playlist_id",
+    b"atID": "artist_id",
+    b"alID": "album_id",
+    b"cmID": "composer_id",
+    b"xid ": "external_id",
+    b"soal": "sort_album",
+    b"soar": "sort_artist",
+    b"soco": "sort_composer",
+    b"sonm": "sort_name",
+    b"sosn": "sort_show",
+    b"sotp": "sort_title",
+    b"aART": "album_artist",
+    b"\xa9grp": "grouping",
+    b"tmpo": "tempo",
+    b"tvnn": "tv_network",
+    b"stvd": "studio",
+    b"cast": "cast",
+    b"dirc": "directors",
+    b"codr": "codirector",
+    b"prod": "producers",
+    b"exec": "executive_producer",
+    b"swnm": "screenwriters",
+    b"\xa9lyr": "lyrics",
+    b"\xa9enc": "encoded_by",
+    b"apID": "itunes_account",
+    b"sfID": "itunes_country",
+    b"ardr": "art_director",
+    b"arrn": "arranger",
+    b"\xa9aut": "lyricist",
+    b"ackn": "acknowledgement",
+    b"\xa9con": "conductor",
+    b"\xa9lin": "linear_notes",
+    b"\xa9mak": "record_company",
+    b"\xa9ope": "original_artist",
+    b"\xa9phg": "phonogram_rights",
+    b"\xa9prd": "song_producer",
+    b"perf": "performer",
+    b"\xa9pub": "publisher",
+    b"seng": "sound_engineer",
+    b"solo": "soloist",
+    b"crdt": "credits",
+    b"\xa9wrk": "work_name",
+    b"\xa9mvn": "movement_name",
+    b"\xa9mvi": "movement_number",
+    b"\xa9mvc": "movement_count",
+    b"shwv": "show_work_and_movement",
+    b"soaa": "sort_album_artist",
+    b"tvsh": "tv_show_name",
+    b"----": "content_rating",
+    b"ownr": "owner",
+}
+
+_HD_VIDEO_DEFINITION_MAP = {3: "2160p UHD", 2: "1080p HD", 1: "720p HD"}
+
+# Rating units carried in the '----' content rating string.
+_RATING_UNIT_DEFINITION_MAP = {400: "1080p HD", 300: "720p HD", 200: "SD"}
+_RATING_UNIT_LEVEL_MAP = {400: 2, 300: 1, 200: 0}
+
+# AAC channelConfiguration -> (channel count, layout).
+_AAC_CHANNEL_CONFIG_MAP = {
+    1: (1, "1.0"),
+    2: (2, "2.0"),
+    3: (3, "3.0"),
+    4: (4, "4.0"),
+    5: (5, "5.0"),
+    6: (6, "5.1"),
+    7: (8, "7.1"),
+}
+
+# AC-3 acmod -> number of full-bandwidth channels.
+_AC3_ACMOD_MAIN_CHANNELS = (2, 1, 2, 3, 3, 4, 4, 5)
+
+# (acmod << 1) | lfeon -> (channel count, layout), shared by dac3 and dec3.
+_AC3_CHANNEL_LAYOUTS = tuple(
+    (main_channels + lfeon, "1+1" if acmod == 0 else f"{main_channels}.{lfeon}")
+    for acmod, main_channels in enumerate(_AC3_ACMOD_MAIN_CHANNELS)
+    for lfeon in (0, 1)
+)
+
 
 def _read_uint8(f: BinaryIO) -> Optional[int]:
     b = f.read(1)
     if not b:
         return None
-    return struct.unpack(">B", b)[0]
+    return _U8.unpack(b)[0]
 
 
 def _read_uint16(f: BinaryIO) -> Optional[int]:
     b = f.read(2)
     if len(b) < 2:
         return None
-    return struct.unpack(">H", b)[0]
+    return _U16.unpack(b)[0]
 
 
 def _read_uint32(f: BinaryIO) -> Optional[int]:
@@ -170,7 +380,7 @@ def _read_uint32(f: BinaryIO) -> Optional[int]:
             f"DEBUG_READ: _read_uint32: EOF or not enough bytes at {f.tell() - len(b)}. Bytes read: {b!r}"
         )
         return None
-    return struct.unpack(">I", b)[0]
+    return _U32.unpack(b)[0]
 
 
 def _read_uint64(f: BinaryIO) -> Optional[int]:
@@ -180,7 +390,7 @@ def _read_uint64(f: BinaryIO) -> Optional[int]:
             f"DEBUG_READ: _read_uint64: EOF or not enough bytes at {f.tell() - len(b)}. Bytes read: {b!r}"
         )
         return None
-    return struct.unpack(">Q", b)[0]
+    return _U64.unpack(b)[0]
 
 
 def _read_box_header(f: BinaryIO) -> Tuple[Optional[bytes], int, int, int]:
@@ -191,19 +401,18 @@ def _read_box_header(f: BinaryIO) -> Tuple[Optional[bytes], int, int, int]:
     box_start = f.tell()
     # logger.debug(f"DEBUG_BOX_HEADER: Attempting to read box header at position {box_start}") # Enable this for very verbose logging
 
-    size_32 = _read_uint32(f)
-    if size_32 is None:
-        logger.debug(
-            f"DEBUG_BOX_HEADER: Failed to read 32-bit size at {box_start}. Returning None."
-        )
-        return None, 0, 0, 0
-
-    box_type_bytes = f.read(4)
-    if len(box_type_bytes) < 4:
-        logger.debug(
-            f"DEBUG_BOX_HEADER: Failed to read 4-byte box type at {f.tell() - len(box_type_bytes)}. Returning None."
-        )
+    header = f.read(8)
+    if len(header) < 8:
+        if len(header) < 4:
+            logger.debug(
+                f"DEBUG_BOX_HEADER: Failed to read 32-bit size at {box_start}. Returning None."
+            )
+        else:
+            logger.debug(
+                f"DEBUG_BOX_HEADER: Failed to read 4-byte box type at {box_start + 4}. Returning None."
+            )
         return None, 0, 0, 0
+    size_32, box_type_bytes = _BOX_HEADER.unpack(header)
 
     if size_32 == 1:  # Extended size (64-bit)
         size_64 = _read_uint64(f)
@@ -234,6 +443,51 @@ def _read_box_header(f: BinaryIO) -> Tuple[Optional[bytes], int, int, int]:
     return box_type_bytes, box_size, box_start, box_end
 
 
+class _AtBoxEnd:
+    """
+    Context manager that leaves a stream at `end` when the block exits,
+    seeking only if the stream is not already there.
+    """
+
+    __slots__ = ("f", "end")
+
+    def __init__(self, f: BinaryIO, end: int):
+        self.f = f
+        self.end = end
+
+    def __enter__(self) -> "_AtBoxEnd":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self.f.tell() != self.end:
+            self.f.seek(self.end)
+        return False
+
+
+def _read_box_header_from_buffer(
+    buf: bytes, offset: int, end: int
+) -> Tuple[Optional[bytes], int, int]:
+    """
+    Parses an MP4 box header at `offset` inside an in-memory buffer and returns
+    (type, payload_start, box_end). A size of 0 extends the box to `end`.
+    Returns (None, 0, 0) if the header is truncated or invalid.
+    """
+    if offset + 8 > end or offset + 8 > len(buf):
+        return None, 0, 0
+    box_size, box_type = _BOX_HEADER.unpack_from(buf, offset)
+    payload_start = offset + 8
+    if box_size == 1:
+        if payload_start + 8 > end or payload_start + 8 > len(buf):
+            return None, 0, 0
+        box_size = _BOX_SIZE_64.unpack_from(buf, payload_start)[0]
+        payload_start += 8
+    if box_size == 0:
+        return box_type, payload_start, end
+    if box_size < 8:
+        return None, 0, 0
+    return box_type, payload_start, offset + box_size
+
+
 def _decode_qt_language_code(lang_bits: int) -> str:
     """Decodes a 15-bit QuickTime language code into a 3-letter string."""
     if not (0 <= lang_bits < 32768):
@@ -5,7 +5,7 @@ import struct
 import io
 from urllib import request
 from urllib.error import URLError, HTTPError
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Set
 import os
 
 from .format_handlers.mp4.mp4 import Mp4Parser
@@ -16,8 +16,17 @@ logger = logging.getLogger(__name__)
 
 
 class MediaInspector:
-    def __init__(self, source_path: str):
+    def __init__(
+        self,
+        source_path: str,
+        include_cover_dimensions: bool = True,
+        wanted_keys: Optional[Set[str]] = None,
+        use_cache: bool = True,
+    ):
         self.source_path = source_path
+        self.include_cover_dimensions = include_cover_dimensions
+        self.wanted_keys = wanted_keys
+        self.use_cache = use_cache
         self.CHUNK_SIZE = 32 * 1024
         self.MP3_AUDIO_BUFFER_SIZE = 128 * 1024
         self.FLAC_METADATA_BUFFER_SIZE = 1 * 1024 * 1024
@@ -48,6 +57,16 @@ class MediaInspector:
             return Mp4Parser
         return None
 
+    def _new_parser(self, parser_class: type):
+        """Instantiates a parser, passing the MP4-specific options to Mp4Parser."""
+        if parser_class is Mp4Parser:
+            return Mp4Parser(
+                include_cover_dimensions=self.include_cover_dimensions,
+                wanted_keys=self.wanted_keys,
+                use_cache=self.use_cache,
+            )
+        return parser_class()
+
     def _handle_remote_mp3(self, operation_func, header_data: bytes):
         """Intelligently fetches the full ID3 tag for remote MP3 files."""
         logger.info("MP3 detected. Fetching full ID3 tag.")
@@ -125,8 +144,10 @@ class MediaInspector:
                     extra_data = self._fetch_range(remote_offset + len(downloaded_buffer), needed)
                     if extra_data: downloaded_buffer.extend(extra_data)
 
-                final_data = (ftyp_atom or b'') + downloaded_buffer[0:size]
-                return operation_func(io.BytesIO(final_data), Mp4Parser())
+                final_data = (ftyp_atom or b"") + downloaded_buffer[0:size]
+                return operation_func(
+                    io.BytesIO(final_data), self._new_parser(Mp4Parser)
+                )
 
             if atom_type == b'mdat':
                 remote_offset += size
@@ -159,7 +180,9 @@ class MediaInspector:
             elif parser_class == Mp4Parser and b'moov' not in signature_chunk:
                 return self._crawl_remote_mp4(operation_func)
             else:
-                parser_instance = parser_class() if parser_class else None
+                parser_instance = (
+                    self._new_parser(parser_class) if parser_class else None
+                )
                 return operation_func(io.BytesIO(signature_chunk), parser_instance)
         else:
             if not os.path.exists(self.source_path):
@@ -177,7 +200,7 @@ class MediaInspector:
                 parser_class = self._get_parser_class_from_signature(signature)
                 if not parser_class:
                     return {"metadata": {"error": "Unsupported file format"}, "video": [], "audio": [], "subtitle": []}
-                parser = parser_class()
+                parser = self._new_parser(parser_class)
 
             return parser.parse(f)
 
@@ -199,7 +222,7 @@ class MediaInspector:
                 f.seek(0)
                 parser_class = self._get_parser_class_from_signature(signature)
                 if not parser_class: return None
-                parser = parser_class()
+                parser = self._new_parser(parser_class)
 
             if hasattr(parser, 'get_cover_art'):
                 return parser.get_cover_art(f)